@@ -1,17 +1,20 @@
 from pathlib import Path
 from tqdm import tqdm
-from reposurfer.core.clone.phase0_runner import run_phase0
-from reposurfer.core.symbol_graph.phase1_runner import run_phase1
+from reposurfer.core.clone.phase0_runner import run_phase0, update_phase0
+from reposurfer.core.clone.repo_updater import RepoUpdater
+from reposurfer.core.clone.utils import save_json
+from reposurfer.core.symbol_graph.phase1_runner import run_phase1, update_phase1
 from reposurfer.core.symbol_graph.phase1_graph_runner import run_phase1_7
-from reposurfer.core.embeddings.phase2_runner import run_phase2
-from reposurfer.core.embeddings.phase2_embed_runner import run_embedding
+from reposurfer.core.embeddings.phase2_runner import run_phase2, update_phase2
+from reposurfer.core.embeddings.phase2_embed_runner import run_embedding, update_embedding
 from reposurfer.core.reasoning.phase3_runner import run_phase3
 
 class RepoSurferApp:
     def __init__(self, storage_root: str = "storage/repos"):
         self.storage_root = Path(storage_root)
 
-    def index_repo(self, repo_url: str):
+    def index_repo(self, repo_url: str, clone_mode: str = "full", depth: int = None,
+                   include=None, exclude=None):
         """
         Full indexing pipeline (Phase 0 → Phase 2.3) with progress tracking
         """
@@ -29,7 +32,8 @@ class RepoSurferApp:
         with tqdm(phases, desc="RepoSurfer Progress", unit="phase") as pbar:
             # Phase 0: Clone and fetch metadata
             pbar.set_description(phases[0][0])
-            run_phase0(repo_url)
+            run_phase0(repo_url, clone_mode=clone_mode, depth=depth,
+                       include=include, exclude=exclude)
             pbar.update(1)
 
             owner, name = repo_url.rstrip("/").split("/")[-2:]
@@ -55,12 +59,34 @@ class RepoSurferApp:
             run_embedding(str(repo_dir))
             pbar.update(1)
 
+        self._save_index_state(repo_dir, RepoUpdater().head_sha(str(repo_dir / "source")))
+
         print(f"\n Repository '{owner}/{name}' indexed successfully!")
         print(f" Stored at: {repo_dir}")
         print("\nYou can now:")
         print(f"  • reposurfer chat {name} \"your question\"")
         print(f"  • reposurfer interactive {name}")
 
+    def update_repo(self, repo_path: str):
+        """
+        Incremental re-index: only files changed since the last indexed commit
+        are re-parsed, re-chunked and re-embedded; vectors of deleted files are dropped.
+        """
+        print(" Updating repository index...")
+        changed, deleted, new_sha = update_phase0(repo_path)
+
+        if changed or deleted:
+            update_phase1(repo_path, changed, deleted)
+            run_phase1_7(repo_path)
+            new_chunks = update_phase2(repo_path, changed, deleted)
+            update_embedding(repo_path, new_chunks, changed + deleted)
+
+        self._save_index_state(Path(repo_path), new_sha)
+        print(f"\n Repository index is at {new_sha[:8]}")
+
+    def _save_index_state(self, repo_dir: Path, sha: str):
+        save_json(str(repo_dir / "index_state.json"), {"sha": sha})
+
     def query(self, repo_path: str, issue: str, mode: str = "auto"):
         """
         Enhanced query with multiple modes
@@ -1,8 +1,9 @@
 import argparse
 import sys
 from pathlib import Path
-from reposurfer.app.reposurfer_app import RepoSurferApp
-from reposurfer.core.reasoning.phase3_runner import run_interactive_mode
+from reposurfer.config import QDRANT_URL, SERVER_HOST, SERVER_PORT
+from reposurfer.core.server.client import ServerClient, ServerError
+from reposurfer.core.symbol_graph.graph_index import GRAPH_QUERIES, get_graph_index
 
 def main():
     parser = argparse.ArgumentParser(
@@ -12,8 +13,11 @@ def main():
         epilog="""
 Examples:
   reposurfer index https://github.com/psf/requests
+  reposurfer update requests
   reposurfer chat requests "Unable to override cookie policy"
   reposurfer interactive requests
+  reposurfer graph requests callers Session.send --depth 2
+  reposurfer serve
         """
     )
     
@@ -22,6 +26,17 @@ Examples:
     # Index command
     index_parser = subparsers.add_parser("index", help="Index a GitHub repository")
     index_parser.add_argument("repo_url", help="GitHub repository URL")
+    index_parser.add_argument("--clone-mode", choices=["full", "shallow", "blobless", "sparse"],
+                              default="full", help="How much of the repository to download (default: full)")
+    index_parser.add_argument("--depth", type=int, help="Limit cloned history to this many commits")
+    index_parser.add_argument("--include", action="append",
+                              help="Glob to check out in sparse mode (repeatable, default: indexed extensions)")
+    index_parser.add_argument("--exclude", action="append",
+                              help="Glob to leave out in sparse mode (repeatable, e.g. 'tests/')")
+    
+    # Update command
+    update_parser = subparsers.add_parser("update", help="Re-index only what changed since the last index")
+    update_parser.add_argument("repo_name", help="Repository name (e.g., 'requests')")
     
     # Chat command (simplified query)
     chat_parser = subparsers.add_parser("chat", help="Ask a question about a repository")
@@ -34,6 +49,20 @@ Examples:
     interactive_parser = subparsers.add_parser("interactive", help="Start interactive Q&A session")
     interactive_parser.add_argument("repo_name", help="Repository name (e.g., 'requests')")
     
+    # Graph command
+    graph_parser = subparsers.add_parser("graph", help="Query the symbol graph of a repository")
+    graph_parser.add_argument("repo_name", help="Repository name (e.g., 'requests')")
+    graph_parser.add_argument("query", choices=sorted(GRAPH_QUERIES), help="Relation to follow")
+    graph_parser.add_argument("symbol", help="Symbol id (e.g. 'Session.send'), file path or module")
+    graph_parser.add_argument("--depth", type=int, default=1,
+                              help="Follow the relation transitively up to this many hops (default: 1)")
+    
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", help="Keep models and indexes loaded and answer chat requests")
+    serve_parser.add_argument("--host", default=SERVER_HOST, help=f"Address to listen on (default: {SERVER_HOST})")
+    serve_parser.add_argument("--port", type=int, default=SERVER_PORT,
+                              help=f"Port to listen on (default: {SERVER_PORT})")
+    
     # List command
     list_parser = subparsers.add_parser("list", help="List all indexed repositories")
     
@@ -43,11 +72,28 @@ Examples:
         parser.print_help()
         return
     
-    app = RepoSurferApp()
+    if args.command in ("index", "update"):
+        if not QDRANT_URL and ServerClient().is_running():
+            # local Qdrant storage can only be opened by one process at a time
+            print("❌ `reposurfer serve` is running and holds the vector store open. Stop it before indexing.")
+            sys.exit(1)
+        from reposurfer.app.reposurfer_app import RepoSurferApp
+        app = RepoSurferApp()
     
     if args.command == "index":
         print(f"🔄 Indexing repository: {args.repo_url}")
-        app.index_repo(args.repo_url)
+        app.index_repo(args.repo_url, clone_mode=args.clone_mode, depth=args.depth,
+                       include=args.include, exclude=args.exclude)
+    
+    elif args.command == "update":
+        repo_path = find_repo_path(args.repo_name)
+        if not repo_path:
+            print(f"❌ Repository '{args.repo_name}' not found. Available repositories:")
+            list_repositories()
+            sys.exit(1)
+        
+        print(f"🔄 Updating repository: {repo_path}")
+        app.update_repo(repo_path)
     
     elif args.command == "chat":
         # Find repository path
@@ -60,9 +106,18 @@ Examples:
         query = " ".join(args.query)
         print(f"🤖 Processing: {query}")
         
-        from reposurfer.core.reasoning.phase3_runner import run_phase3
         mode = args.mode if args.mode != "auto" else None
-        run_phase3(repo_path, query, mode=mode)
+        client = ServerClient()
+        if client.is_running():
+            # models and indexes are already loaded in the server
+            try:
+                print(client.chat(repo_path, query, mode=mode))
+            except ServerError as e:
+                print(f"❌ Server error: {e}")
+                sys.exit(1)
+        else:
+            from reposurfer.core.reasoning.phase3_runner import run_phase3
+            run_phase3(repo_path, query, mode=mode)
     
     elif args.command == "interactive":
         repo_path = find_repo_path(args.repo_name)
@@ -71,7 +126,23 @@ Examples:
             list_repositories()
             sys.exit(1)
         
-        run_interactive_mode(repo_path)
+        from reposurfer.core.reasoning.phase3_runner import run_interactive_mode
+        # a running server holds the local vector store, so questions must go through it
+        client = ServerClient()
+        run_interactive_mode(repo_path, client if client.is_running() else None)
+    
+    elif args.command == "graph":
+        repo_path = find_repo_path(args.repo_name)
+        if not repo_path:
+            print(f"❌ Repository '{args.repo_name}' not found. Available repositories:")
+            list_repositories()
+            sys.exit(1)
+        
+        print_graph_query(repo_path, args.query, args.symbol, args.depth)
+    
+    elif args.command == "serve":
+        from reposurfer.core.server.query_server import run_server
+        run_server(args.host, args.port)
     
     elif args.command == "list":
         list_repositories()
@@ -105,6 +176,29 @@ def find_repo_path(repo_name: str) -> str:
     
     return None
 
+def print_graph_query(repo_path: str, query: str, symbol: str, depth: int):
+    """Run one GraphIndex query and print the related symbols grouped by hop"""
+    index = get_graph_index(repo_path)
+    
+    matches = index.resolve(symbol)
+    if not matches and index.graph.lookup(symbol) is None:
+        print(f"❌ Symbol '{symbol}' not found in the graph")
+        return
+    if len(matches) > 1:
+        print(f"⚠️  '{symbol}' is ambiguous, candidates:")
+        for name in matches:
+            print(f"  • {name}")
+        return
+    symbol = matches[0] if matches else symbol
+    
+    results = index.query(query, symbol, max_depth=depth)
+    print(f"🔗 {query} of {symbol}: {len(results)} found")
+    for name, hops in sorted(results.items(), key=lambda item: (item[1], item[0])):
+        node = index.node(name)
+        location = f" ({node['type']}, {node['file']})" if node and node["file"] else ""
+        indent = "  " * hops
+        print(f"{indent}• {name}{location}")
+
 def list_repositories():
     """List all indexed repositories"""
     storage_root = Path("storage/repos")
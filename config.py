@@ -3,4 +3,32 @@ from dotenv import load_dotenv
 
 load_dotenv()
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-BASE_STORAGE_PATH="storage/repos"
\ No newline at end of file
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_MAX_WORKERS = int(os.getenv("REPOSURFER_GITHUB_WORKERS", "8"))
+BASE_STORAGE_PATH="storage/repos"
+CACHE_STORAGE_PATH = "storage/cache"
+MIRROR_STORAGE_PATH = "storage/mirrors"
+USE_MIRROR_CACHE = os.getenv("REPOSURFER_MIRROR_CACHE", "1") != "0"
+TREE_MAX_FILE_BYTES = int(os.getenv("REPOSURFER_MAX_FILE_BYTES", str(1024 * 1024)))
+TREE_WORKERS = int(os.getenv("REPOSURFER_TREE_WORKERS", str(min(32, (os.cpu_count() or 1) * 4))))
+PARSE_WORKERS = int(os.getenv("REPOSURFER_PARSE_WORKERS", str(os.cpu_count() or 1)))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("REPOSURFER_PARSE_TIMEOUT", "30"))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("REPOSURFER_PARSE_MEMORY_MB", "2048"))
+GRAPH_TOPK_NEIGHBORS = int(os.getenv("REPOSURFER_GRAPH_TOPK", "16"))
+GRAPH_WALK_HOPS = int(os.getenv("REPOSURFER_GRAPH_HOPS", "3"))
+GRAPH_WALK_DECAY = float(os.getenv("REPOSURFER_GRAPH_DECAY", "0.5"))
+GRAPH_WALK_BUDGET = int(os.getenv("REPOSURFER_GRAPH_BUDGET", "256"))
+CHUNK_WORKERS = int(os.getenv("REPOSURFER_CHUNK_WORKERS", str(os.cpu_count() or 1)))
+EMBED_BATCH_TOKENS = int(os.getenv("REPOSURFER_EMBED_BATCH_TOKENS", "16384"))
+EMBED_WINDOW_OVERLAP = int(os.getenv("REPOSURFER_EMBED_WINDOW_OVERLAP", "32"))
+EMBED_STREAM_BATCH = int(os.getenv("REPOSURFER_EMBED_STREAM_BATCH", "512"))
+EMBED_WORKERS = int(os.getenv("REPOSURFER_EMBED_WORKERS", "1"))
+EMBED_WORKER_THREADS = int(os.getenv("REPOSURFER_EMBED_WORKER_THREADS", "0"))
+EMBED_BACKEND = os.getenv("REPOSURFER_EMBED_BACKEND", "sentence-transformers")
+USE_EMBED_CACHE = os.getenv("REPOSURFER_EMBED_CACHE", "1") != "0"
+VECTOR_DIM = int(os.getenv("REPOSURFER_VECTOR_DIM", "0"))
+VECTOR_DTYPE = os.getenv("REPOSURFER_VECTOR_DTYPE", "float32")
+QDRANT_URL = os.getenv("REPOSURFER_QDRANT_URL", "")
+VECTOR_UPLOAD_WORKERS = int(os.getenv("REPOSURFER_VECTOR_UPLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+SERVER_HOST = os.getenv("REPOSURFER_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("REPOSURFER_SERVER_PORT", "8765"))
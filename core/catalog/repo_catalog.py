@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from reposurfer.core.embeddings.symbol_chunk_builder import chunk_content_hash
+from reposurfer.core.symbol_graph.language_detector import detect_language
+from reposurfer.core.symbol_graph.symbols import SYMBOL_FIELDS
+
+CATALOG_FILE = "catalog.db"
+CATALOG_SCHEMA_VERSION = 1
+
+# list-valued symbol columns, stored as JSON text
+JSON_SYMBOL_FIELDS = {"bases", "calls"}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    hash TEXT,
+    language TEXT,
+    imports TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    {", ".join(f"{field} {'INTEGER' if field.endswith('_line') else 'TEXT'}" for field in SYMBOL_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS symbols_symbol_id ON symbols(symbol_id);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols(file_id);
+CREATE TABLE IF NOT EXISTS edges (
+    type TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS edges_source ON edges(source, type);
+CREATE INDEX IF NOT EXISTS edges_target ON edges(target, type);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    symbol_id TEXT NOT NULL,
+    symbol_type TEXT,
+    start_line INTEGER,
+    end_line INTEGER,
+    text TEXT NOT NULL,
+    content_hash TEXT,
+    metadata TEXT NOT NULL DEFAULT '{{}}'
+);
+CREATE INDEX IF NOT EXISTS chunks_symbol_id ON chunks(symbol_id);
+CREATE INDEX IF NOT EXISTS chunks_file ON chunks(file_id);
+CREATE INDEX IF NOT EXISTS chunks_content_hash ON chunks(content_hash);
+"""
+
+
+class RepoCatalog:
+    """
+    Per-repo SQLite store (storage/repos/<repo>/catalog.db) for files,
+    symbols, graph edges and chunks. WAL mode lets queries run while an
+    update is being written; every phase writes inside one transaction, so
+    an interrupted incremental update leaves the previous state intact.
+    """
+
+    def __init__(self, repo_path: str):
+        self.path = os.path.join(repo_path, CATALOG_FILE)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, CATALOG_SCHEMA_VERSION):
+            raise ValueError(f"catalog schema v{version} in {self.path} is not supported, re-run indexing")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version={CATALOG_SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """Commit everything written inside the block at once, or nothing on error."""
+        with self.conn:
+            yield self
+
+    # ---- files & symbols ----
+
+    def _file_id(self, rel_path: str):
+        row = self.conn.execute("SELECT id FROM files WHERE path = ?", (rel_path,)).fetchone()
+        return row[0] if row else None
+
+    def clear(self):
+        self.conn.execute("DELETE FROM files")
+
+    def delete_files(self, paths):
+        """Drop files with their symbols and chunks."""
+        self.conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in paths))
+
+    def write_file(self, rel_path: str, imports, rows, content_hash: str = None):
+        """Replace one file record and its symbol rows (SYMBOL_FIELDS order)."""
+        self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+        file_id = self.conn.execute(
+            "INSERT INTO files (path, hash, language, imports) VALUES (?, ?, ?, ?)",
+            (rel_path, content_hash, detect_language(rel_path), json.dumps(imports)),
+        ).lastrowid
+        json_columns = [field in JSON_SYMBOL_FIELDS for field in SYMBOL_FIELDS]
+        self.conn.executemany(
+            f"INSERT INTO symbols (file_id, {', '.join(SYMBOL_FIELDS)}) "
+            f"VALUES (?, {', '.join('?' for _ in SYMBOL_FIELDS)})",
+            ((file_id, *(json.dumps(v) if is_json else v for v, is_json in zip(row, json_columns)))
+             for row in rows),
+        )
+
+    # ---- edges ----
+
+    def replace_edges(self, edges):
+        """edges: iterable of {"type", "source", "target"}, streamed into the table."""
+        self.conn.execute("DELETE FROM edges")
+        self.conn.executemany(
+            "INSERT INTO edges (type, source, target) VALUES (?, ?, ?)",
+            ((e["type"], e["source"], e["target"]) for e in edges),
+        )
+
+    # ---- chunks ----
+
+    def clear_chunks(self, paths=None):
+        if paths is None:
+            self.conn.execute("DELETE FROM chunks")
+        else:
+            self.conn.executemany(
+                "DELETE FROM chunks WHERE file_id = (SELECT id FROM files WHERE path = ?)",
+                ((p,) for p in paths))
+
+    def write_chunks(self, chunks):
+        file_ids = {}
+        for chunk in chunks:
+            rel_path = chunk["file"]
+            if rel_path not in file_ids:
+                # a catalog filled before Phase 1 wrote to it has no file rows yet
+                self.conn.execute("INSERT OR IGNORE INTO files (path, language) VALUES (?, ?)",
+                                  (rel_path, detect_language(rel_path)))
+                file_ids[rel_path] = self._file_id(rel_path)
+        self.conn.executemany(
+            "INSERT INTO chunks (file_id, symbol_id, symbol_type, start_line, end_line, text, content_hash, metadata) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ((file_ids[c["file"]], c["symbol_id"], c["symbol_type"], c["start_line"], c["end_line"],
+              c["text"], c.get("content_hash") or chunk_content_hash(c["text"]), json.dumps(c.get("metadata", {})))
+             for c in chunks),
+        )
+
+    @staticmethod
+    def _chunk(row):
+        if row is None:
+            return None
+        return {
+            "symbol_id": row["symbol_id"],
+            "symbol_type": row["symbol_type"],
+            "file": row["path"],
+            "start_line": row["start_line"],
+            "end_line": row["end_line"],
+            "text": row["text"],
+            "content_hash": row["content_hash"],
+            "metadata": json.loads(row["metadata"]),
+        }
+
+    def chunk(self, symbol_id: str):
+        row = self.conn.execute(
+            "SELECT c.*, f.path FROM chunks c JOIN files f ON f.id = c.file_id "
+            "WHERE c.symbol_id = ? ORDER BY c.id LIMIT 1", (symbol_id,)).fetchone()
+        return self._chunk(row)
+
+    def iter_chunks(self, paths=None):
+        """Stream chunks in insertion order, optionally only for some files."""
+        query = "SELECT c.*, f.path FROM chunks c JOIN files f ON f.id = c.file_id"
+        if paths is None:
+            rows = self.conn.execute(f"{query} ORDER BY c.id")
+            yield from (self._chunk(row) for row in rows)
+            return
+        for rel_path in paths:
+            rows = self.conn.execute(f"{query} WHERE f.path = ? ORDER BY c.id", (rel_path,))
+            yield from (self._chunk(row) for row in rows)
+
+    def chunks_with_hashes(self, hashes):
+        """Every chunk whose body hash is in `hashes`, in insertion order."""
+        hashes = list(hashes)
+        rows = []
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            rows += self.conn.execute(
+                "SELECT c.*, f.path FROM chunks c JOIN files f ON f.id = c.file_id "
+                f"WHERE c.content_hash IN ({', '.join('?' for _ in batch)})", batch).fetchall()
+        rows.sort(key=lambda row: row["id"])
+        return [self._chunk(row) for row in rows]
+
+    def iter_chunks_by_hash(self, after: str = None):
+        """
+        Stream chunks ordered by content hash, copies of one body in insertion
+        order, so each body's chunks arrive together. `after` skips every hash
+        up to and including it.
+        """
+        query = "SELECT c.*, f.path FROM chunks c JOIN files f ON f.id = c.file_id"
+        if after is None:
+            rows = self.conn.execute(f"{query} ORDER BY c.content_hash, c.id")
+        else:
+            rows = self.conn.execute(f"{query} WHERE c.content_hash > ? ORDER BY c.content_hash, c.id", (after,))
+        yield from (self._chunk(row) for row in rows)
+
+    def count_chunks(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def count_bodies(self) -> int:
+        return self.conn.execute("SELECT COUNT(DISTINCT content_hash) FROM chunks").fetchone()[0]
+
+    def chunks_fingerprint(self) -> str:
+        """Changes whenever a chunk is added, removed, moved or its body changes."""
+        digest = hashlib.blake2b(digest_size=16)
+        rows = self.conn.execute(
+            "SELECT c.content_hash, c.symbol_id, f.path FROM chunks c JOIN files f ON f.id = c.file_id ORDER BY c.id")
+        for row in rows:
+            digest.update("\0".join(str(value) for value in row).encode("utf-8") + b"\n")
+        return digest.hexdigest()
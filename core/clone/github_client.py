@@ -1,17 +1,79 @@
+import json
+import os
+import re
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlparse, parse_qs
+
 from github import Github
-from reposurfer.config import GITHUB_TOKEN
+from reposurfer.config import GITHUB_TOKEN, GITHUB_API_URL, GITHUB_MAX_WORKERS, CACHE_STORAGE_PATH
+from reposurfer.core.clone.http_cache import ETagCache
+from reposurfer.core.clone.utils import JsonlWriter, load_json, save_json
+
+PER_PAGE = 100
+LAST_PAGE_RE = re.compile(r'<([^>]+)>;\s*rel="last"')
+
+
+def _last_page(link_header):
+    if not link_header:
+        return 1
+    match = LAST_PAGE_RE.search(link_header)
+    if not match:
+        return 1
+    page = parse_qs(urlparse(match.group(1)).query).get("page", ["1"])[0]
+    return int(page)
+
+
+def _issue_record(i):
+    return {
+        "id": i["id"],
+        "number": i["number"],
+        "title": i["title"],
+        "state": i["state"],
+        "created_at": i["created_at"],
+        "updated_at": i.get("updated_at"),
+        "closed_at": i.get("closed_at"),
+        "labels": [l["name"] for l in i.get("labels", [])]
+    }
+
+
+def _pull_request_record(pr):
+    return {
+        "id": pr["id"],
+        "number": pr["number"],
+        "title": pr["title"],
+        "state": pr["state"],
+        "created_at": pr["created_at"],
+        "updated_at": pr.get("updated_at"),
+        "merged_at": pr.get("merged_at"),
+        "closed_at": pr.get("closed_at"),
+    }
+
 
 class GitHubClient:
-    def __init__(self):
-        if not GITHUB_TOKEN:
+    def __init__(self, token=GITHUB_TOKEN, api_url=GITHUB_API_URL,
+                 max_workers=GITHUB_MAX_WORKERS,
+                 cache_dir=os.path.join(CACHE_STORAGE_PATH, "github")):
+        if not token:
             raise ValueError("Github token not found")
-        self.client = Github(GITHUB_TOKEN)
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.max_workers = max_workers
+        self.cache = ETagCache(cache_dir)
+        self.client = Github(token, base_url=self.api_url)
+        # pages of every listing share one bounded pool
+        self._page_pool = ThreadPoolExecutor(max_workers=max_workers)
+
     def get_repo(self, repo_url:str):
         """
         repo_url: https://github.com/owner/repo
         """
         path = repo_url.replace("https://github.com/","")
         return self.client.get_repo(path)
+
     def get_commits(self,repo):
         return [
             {
@@ -23,33 +85,135 @@ class GitHubClient:
             }
             for c in repo.get_commits()
         ]
-    def get_issues(self,repo):
-        return [
-            {
-                "id": i.id,
-                "number": i.number,
-                "title": i.title,
-                "state": i.state,
-                "created_at": i.created_at.isoformat(),
-                "closed_at": i.closed_at.isoformat() if i.closed_at else None,
-                "labels": [l.name for l in i.labels]
-            }
-            for i in repo.get_issues(state="all")
-        ]
-    def get_pull_requests(self,repo):
-        return [
-            {
-                "id": pr.id,
-                "number": pr.number,
-                "title": pr.title,
-                "state": pr.state,
-                "created_at": pr.created_at.isoformat(),
-                "merged_at": pr.merged_at.isoformat() if pr.merged_at else None,
-                "closed_at": pr.closed_at.isoformat() if pr.closed_at else None,
-            }
-            for pr in repo.get_pulls(state="all")
-        ]
-    def get_branches(self,repo):
-        return [b.name for b in repo.get_branches()]
-    def get_tags(self,repo):
-        return [t.name for t in repo.get_tags()]
\ No newline at end of file
+
+    # ---------------- REST paging ----------------
+
+    def _url(self, path: str, params: dict) -> str:
+        return f"{self.api_url}{path}?{urlencode(sorted(params.items()))}"
+
+    def _request(self, url: str):
+        """GET with conditional request support. Returns (body, link header)."""
+        cached = self.cache.get(url)
+        request = urllib.request.Request(url, headers={
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+        })
+        if cached and cached.get("etag"):
+            request.add_header("If-None-Match", cached["etag"])
+
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body = json.load(response)
+                link = response.headers.get("Link")
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                return cached["body"], cached.get("link")
+            raise
+
+        if etag:
+            self.cache.put(url, etag, body, link)
+        return body, link
+
+    def _fetch_page(self, path: str, params: dict, page: int):
+        body, _ = self._request(self._url(path, {**params, "per_page": PER_PAGE, "page": page}))
+        return body
+
+    def _stream_pages(self, path: str, params: dict, transform, writer: JsonlWriter):
+        """
+        Fetch page 1, read the page count from its Link header and fetch the rest
+        on the page pool. Pages are written in order as they arrive, with at most
+        2 * max_workers pages in flight.
+        """
+        first, link = self._request(self._url(path, {**params, "per_page": PER_PAGE, "page": 1}))
+        writer.write_many(transform(item) for item in first)
+
+        last = _last_page(link)
+        pages = iter(range(2, last + 1))
+        in_flight = deque()
+        for page in pages:
+            in_flight.append(self._page_pool.submit(self._fetch_page, path, params, page))
+            if len(in_flight) >= 2 * self.max_workers:
+                break
+        while in_flight:
+            body = in_flight.popleft().result()
+            writer.write_many(transform(item) for item in body)
+            next_page = next(pages, None)
+            if next_page is not None:
+                in_flight.append(self._page_pool.submit(self._fetch_page, path, params, next_page))
+        return writer.count
+
+    def _stream_updated_since(self, path: str, params: dict, since: str, transform, writer: JsonlWriter):
+        """For listings without a `since` filter: walk newest-updated first and stop at `since`."""
+        page = 1
+        while True:
+            body = self._fetch_page(path, {**params, "sort": "updated", "direction": "desc"}, page)
+            for item in body:
+                if item.get("updated_at") and item["updated_at"] < since:
+                    return writer.count
+                writer.write(transform(item))
+            if len(body) < PER_PAGE:
+                return writer.count
+            page += 1
+
+    # ---------------- listings ----------------
+
+    def get_issues(self, repo, out_path: str, since: str = None) -> int:
+        """Stream issues to JSONL. With `since`, only issues updated after it are appended."""
+        params = {"state": "all"}
+        if since:
+            params["since"] = since
+        with JsonlWriter(out_path, append=bool(since)) as writer:
+            return self._stream_pages(f"/repos/{repo.full_name}/issues", params, _issue_record, writer)
+
+    def get_pull_requests(self, repo, out_path: str, since: str = None) -> int:
+        path = f"/repos/{repo.full_name}/pulls"
+        with JsonlWriter(out_path, append=bool(since)) as writer:
+            if since:
+                return self._stream_updated_since(path, {"state": "all"}, since, _pull_request_record, writer)
+            return self._stream_pages(path, {"state": "all"}, _pull_request_record, writer)
+
+    def get_branches(self, repo, out_path: str) -> int:
+        with JsonlWriter(out_path) as writer:
+            return self._stream_pages(f"/repos/{repo.full_name}/branches", {}, lambda b: b["name"], writer)
+
+    def get_tags(self, repo, out_path: str) -> int:
+        with JsonlWriter(out_path) as writer:
+            return self._stream_pages(f"/repos/{repo.full_name}/tags", {}, lambda t: t["name"], writer)
+
+    def fetch_metadata(self, repo, base_path: str) -> dict:
+        """
+        Fetch issues, pull requests, branches and tags concurrently into JSONL files.
+        Issues and pull requests are incremental: a re-run appends only items updated
+        since the last successful sync (later lines supersede earlier ones with the same id).
+        """
+        state_path = os.path.join(base_path, "sync_state.json")
+        state = load_json(state_path, default={})
+        started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        def since(name, filename):
+            if not os.path.exists(os.path.join(base_path, filename)):
+                return None
+            return state.get(name)
+
+        jobs = {
+            "issues": lambda: self.get_issues(
+                repo, os.path.join(base_path, "issues.jsonl"), since("issues", "issues.jsonl")),
+            "pull_requests": lambda: self.get_pull_requests(
+                repo, os.path.join(base_path, "pull_requests.jsonl"), since("pull_requests", "pull_requests.jsonl")),
+            "branches": lambda: self.get_branches(repo, os.path.join(base_path, "branches.jsonl")),
+            "tags": lambda: self.get_tags(repo, os.path.join(base_path, "tags.jsonl")),
+        }
+
+        counts = {}
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            futures = {name: pool.submit(job) for name, job in jobs.items()}
+            for name, future in futures.items():
+                counts[name] = future.result()
+                state[name] = started_at
+
+        save_json(state_path, state)
+        return counts
+
+    def close(self):
+        self._page_pool.shutdown(wait=False)
@@ -0,0 +1,98 @@
+import os
+import re
+
+
+def _translate(glob: str) -> str:
+    """gitignore glob -> regex body ("**" crosses directories, "*" does not)."""
+    out = []
+    i = 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == len(glob):
+            out.append("/.*")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif glob[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif glob[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif glob[i] == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(glob[i]))
+                i += 1
+            else:
+                body = glob[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        else:
+            out.append(re.escape(glob[i]))
+            i += 1
+    return "".join(out)
+
+
+class GitIgnore:
+    """Rules of one .gitignore file, matched against paths relative to its directory."""
+
+    def __init__(self, base: str, lines):
+        self.base = base
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            # a leading or inner slash anchors the pattern to this .gitignore's directory
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            prefix = "" if anchored else "(?:.*/)?"
+            regex = re.compile(f"^{prefix}{_translate(line)}$")
+            self.rules.append((regex, negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path: str, base: str):
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return cls(base, f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool):
+        """True = ignored, False = re-included by a negation, None = no rule applies."""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def gitignored(ignores, rel_path: str, is_dir: bool) -> bool:
+    """Apply .gitignore files from the root down; the deepest matching rule wins."""
+    ignored = False
+    for gitignore in ignores:
+        result = gitignore.match(rel_path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
@@ -0,0 +1,36 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class ETagCache:
+    """
+    On-disk cache of GET responses keyed by URL.
+    A stored ETag is sent back as If-None-Match; on 304 the cached body is replayed.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str):
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, etag: str, body, link: str = None):
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "link": link, "body": body}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,54 @@
+import os
+from git import Repo
+from reposurfer.config import MIRROR_STORAGE_PATH
+
+
+class MirrorCache:
+    """
+    Bare repositories shared by every clone of the same fork network.
+    Clones borrow objects from the mirror through git alternates, so a mirror
+    must not be deleted (or pruned) while checkouts still reference it.
+    """
+
+    def __init__(self, mirror_root=MIRROR_STORAGE_PATH):
+        self.mirror_root = mirror_root
+
+    def mirror_path(self, full_name: str) -> str:
+        owner, name = full_name.split("/")
+        return os.path.abspath(os.path.join(self.mirror_root, f"{owner}__{name}.git"))
+
+    def _add_remote(self, repo: Repo, name: str, url: str, refspecs):
+        if name in [r.name for r in repo.remotes]:
+            return
+        repo.git.remote("add", name, url)
+        repo.git.config("--unset-all", f"remote.{name}.fetch")
+        for refspec in refspecs:
+            repo.git.config("--add", f"remote.{name}.fetch", refspec)
+
+    def sync(self, upstream_url: str, full_name: str, extra_urls=()) -> str:
+        """
+        Create or refresh the mirror of `full_name`. `extra_urls` (forks) are added
+        as remotes so their objects are local too. Returns the mirror path.
+        """
+        path = self.mirror_path(full_name)
+        if os.path.exists(path):
+            repo = Repo(path)
+            print(f"[MirrorCache] Fetching mirror {path}")
+        else:
+            print(f"[MirrorCache] Creating mirror {path}")
+            os.makedirs(self.mirror_root, exist_ok=True)
+            repo = Repo.init(path, bare=True)
+            # heads and tags only, GitHub's refs/pull/* would bloat the mirror
+            self._add_remote(repo, "origin", upstream_url,
+                             ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"])
+
+        for url in extra_urls:
+            slug = url.rstrip("/").removesuffix(".git").replace("https://github.com/", "").replace("/", "__")
+            self._add_remote(repo, slug, url, [f"+refs/heads/*:refs/remotes/{slug}/*"])
+
+        self.fetch(path)
+        return path
+
+    def fetch(self, path: str):
+        """Refresh the mirror from upstream and every fork added to it."""
+        Repo(path).git.fetch("--all", "--prune")
@@ -1,17 +1,26 @@
 import os
 from reposurfer.core.clone.github_client import GitHubClient
 from reposurfer.core.clone.repo_cloner import RepoCloner
-from reposurfer.core.clone.tree_builder import FileTreeBuilder
+from reposurfer.core.clone.repo_updater import RepoUpdater
+from reposurfer.core.clone.mirror_cache import MirrorCache
+from reposurfer.core.clone.tree_builder import FileTreeBuilder, match_patterns
 from reposurfer.core.clone.metadata_extractor import MetadataExtractor
-from reposurfer.core.clone.utils import save_json
-from reposurfer.config import BASE_STORAGE_PATH
-
-
-def run_phase0(repo_url: str):
+from reposurfer.core.clone.utils import save_json, load_json
+from reposurfer.config import BASE_STORAGE_PATH, USE_MIRROR_CACHE
+
+
+def run_phase0(repo_url: str, clone_mode: str = "full", depth: int = None,
+               include=None, exclude=None, use_mirror: bool = USE_MIRROR_CACHE):
+    """
+    clone_mode: full | shallow | blobless | sparse (see RepoCloner).
+    include/exclude: globs for the sparse checkout.
+    use_mirror: borrow objects from a local mirror of the fork network (full clones only,
+                the other modes exist to avoid downloading everything).
+    """
     print(f"[Phase0] Processing {repo_url}")
 
     client = GitHubClient()
-    cloner = RepoCloner()
+    cloner = RepoCloner(mode=clone_mode, depth=depth, include=include, exclude=exclude)
     tree_builder = FileTreeBuilder()
     metadata_extractor = MetadataExtractor()
 
@@ -28,26 +37,94 @@ def run_phase0(repo_url: str):
     save_json(f"{base_path}/commits.json",
               client.get_commits(repo))
 
-    save_json(f"{base_path}/issues.json",
-              client.get_issues(repo))
-
-    save_json(f"{base_path}/pull_requests.json",
-              client.get_pull_requests(repo))
-
-    save_json(f"{base_path}/branches.json",
-              client.get_branches(repo))
-
-    save_json(f"{base_path}/tags.json",
-              client.get_tags(repo))
+    counts = client.fetch_metadata(repo, base_path)
+    print(f"[Phase0] Synced {counts['issues']} issues, {counts['pull_requests']} pull requests, "
+          f"{counts['branches']} branches, {counts['tags']} tags")
+    client.close()
 
     # --- Clone + tree ---
-    source_path = cloner.clone_repo(repo_url, base_path)
-    tree = tree_builder.build_tree(source_path)
+    mirror_path = None
+    if use_mirror and clone_mode == "full":
+        network = repo.source if repo.fork and repo.source else repo
+        mirror_path = MirrorCache().sync(
+            network.clone_url,
+            network.full_name,
+            extra_urls=[repo.clone_url] if network is not repo else ()
+        )
+
+    source_path = cloner.clone_repo(repo_url, base_path, mirror_path=mirror_path)
+    save_json(f"{base_path}/clone.json", {**cloner.describe(), "mirror": mirror_path})
+    tree = tree_builder.build_tree(source_path, patterns=cloner.patterns)
+    skipped = ", ".join(f"{n} {reason}" for reason, n in tree_builder.stats.items())
+    print(f"[Phase0] File tree: {len(tree)} files" + (f" (skipped {skipped})" if skipped else ""))
 
     save_json(f"{base_path}/tree.json", tree)
 
     print("[Phase0] Completed successfully")
 
 
+def update_phase0(repo_path: str):
+    """
+    Incremental Phase 0: fetch new commits, diff them against the last indexed SHA,
+    check out the new tip and patch tree.json.
+    Returns (changed, deleted, new_sha) limited to files the index tracks.
+    """
+    source_path = os.path.join(repo_path, "source")
+    state = load_json(os.path.join(repo_path, "index_state.json"))
+    if not state:
+        raise FileNotFoundError("index_state.json not found, run a full index first")
+
+    mirror_path = load_json(os.path.join(repo_path, "clone.json"), default={}).get("mirror")
+    if mirror_path and os.path.exists(mirror_path):
+        MirrorCache().fetch(mirror_path)
+
+    updater = RepoUpdater()
+    new_sha = updater.fetch(source_path)
+    if new_sha == state["sha"]:
+        print("[Phase0] Already up to date")
+        return [], [], new_sha
+
+    changed, deleted = updater.diff(source_path, state["sha"], new_sha)
+    updater.checkout(source_path, new_sha)
+
+    tree_builder = FileTreeBuilder()
+    patterns = load_json(os.path.join(repo_path, "clone.json"), default={}).get("sparse_patterns")
+
+    def tracked(rel_path):
+        # the same selection as build_tree in a full index
+        if tree_builder.is_ignored(rel_path, source_path):
+            return False
+        return not patterns or match_patterns(rel_path, patterns)
+
+    tree_path = os.path.join(repo_path, "tree.json")
+    tree = load_json(tree_path, default=[])
+    indexed = {e["path"] for e in tree}
+    # a changed file that is now ignored leaves the index like a deleted one
+    deleted = [p for p in deleted if tracked(p) or p in indexed] + \
+              [p for p in changed if not tracked(p) and p in indexed]
+    changed = [p for p in changed if tracked(p)]
+
+    touched = set(changed) | set(deleted)
+    tree = [e for e in tree if e["path"] not in touched]
+    kept = []
+    for rel_path in changed:
+        entry = None
+        if os.path.isfile(os.path.join(source_path, rel_path)):
+            entry = tree_builder.build_entry(source_path, rel_path)
+        if entry:
+            tree.append(entry)
+            kept.append(rel_path)
+        else:
+            # now filtered out of the tree: drop whatever was indexed for it
+            deleted.append(rel_path)
+    changed = kept
+    tree.sort(key=lambda e: e["path"])
+    save_json(tree_path, tree)
+
+    print(f"[Phase0] {state['sha'][:8]}..{new_sha[:8]}: "
+          f"{len(changed)} added/modified, {len(deleted)} deleted")
+    return changed, deleted, new_sha
+
+
 if __name__ == "__main__":
     run_phase0("https://github.com/psf/requests")
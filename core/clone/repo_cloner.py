@@ -2,10 +2,27 @@ import os
 from git import Repo
 from tqdm import tqdm
 from reposurfer.config import BASE_STORAGE_PATH
+from reposurfer.core.clone.repo_updater import RepoUpdater
+from reposurfer.core.clone.tree_builder import sparse_patterns
+
+CLONE_MODES = ("full", "shallow", "blobless", "sparse")
 
 class RepoCloner:
-    def __init__(self,base_path=BASE_STORAGE_PATH):
+    def __init__(self,base_path=BASE_STORAGE_PATH, mode="full", depth=None, include=None, exclude=None):
+        """
+        mode:
+          full     -> complete history and every blob
+          shallow  -> history truncated to `depth` commits (default 1)
+          blobless -> --filter=blob:none, blobs fetched on checkout
+          sparse   -> blobless + sparse checkout of the include/exclude globs
+                      (defaults to the extensions in EXTENSION_LANGUAGE_MAP)
+        """
+        if mode not in CLONE_MODES:
+            raise ValueError(f"Unknown clone mode: {mode}")
         self.base_path = base_path
+        self.mode = mode
+        self.depth = depth if depth or mode != "shallow" else 1
+        self.patterns = sparse_patterns(include, exclude) if mode == "sparse" else None
     
     def _repo_dir_name(self,repo_url: str) -> str:
         """
@@ -14,11 +31,35 @@ class RepoCloner:
         path = repo_url.replace("https://github.com/", "")
         owner, repo = path.split("/")
         return f"{owner}_{repo}"
+
+    def describe(self) -> dict:
+        """Clone layout, saved next to the source so later phases know what is materialized."""
+        return {
+            "mode": self.mode,
+            "depth": self.depth,
+            "sparse_patterns": self.patterns,
+        }
+
+    def _clone_options(self):
+        kwargs = {}
+        multi_options = []
+        if self.depth:
+            kwargs["depth"] = self.depth
+        if self.mode in ("blobless", "sparse"):
+            multi_options.append("--filter=blob:none")
+        if self.mode == "sparse":
+            kwargs["no_checkout"] = True
+        return multi_options, kwargs
+
+    def _apply_sparse_checkout(self, repo: Repo):
+        repo.git.sparse_checkout("set", "--no-cone", *self.patterns)
+        repo.git.checkout(repo.active_branch.name)
     
-    def clone_repo(self, repo_url: str, target_path: str) -> str:
+    def clone_repo(self, repo_url: str, target_path: str, mirror_path: str = None) -> str:
 
         """
-        Clones repo if not already present.
+        Clones repo if not already present, otherwise fetches and moves it to the remote tip.
+        mirror_path: bare mirror (see MirrorCache) to borrow objects from.
         Returns local path to repo source.
         """
         repo_dir = self._repo_dir_name(repo_url)
@@ -26,12 +67,17 @@ class RepoCloner:
         source_path = os.path.join(target_path, "source")
 
         if os.path.exists(source_path):
-            print(f"[RepoCloner] Repo already cloned: {source_path}")
+            print(f"[RepoCloner] Repo already cloned, fetching: {source_path}")
+            updater = RepoUpdater()
+            updater.checkout(source_path, updater.fetch(source_path))
             return source_path
 
         os.makedirs(repo_base_path, exist_ok=True)
 
-        print(f"[RepoCloner] Cloning {repo_url} into {source_path}")
+        print(f"[RepoCloner] Cloning {repo_url} into {source_path} (mode={self.mode})")
+        multi_options, clone_kwargs = self._clone_options()
+        if mirror_path:
+            multi_options.append(f"--reference-if-able={mirror_path}")
         
         # Clone with progress tracking
         try:
@@ -42,9 +88,19 @@ class RepoCloner:
                 # Update progress at key stages
                 pbar.update(10)  # Starting
                 
-                Repo.clone_from(repo_url, source_path)
+                repo = Repo.clone_from(
+                    repo_url,
+                    source_path,
+                    multi_options=multi_options or None,
+                    **clone_kwargs
+                )
                 
-                pbar.update(80)  # Almost done
+                pbar.update(60)
+                if self.mode == "sparse":
+                    pbar.set_postfix({"status": "sparse checkout"})
+                    self._apply_sparse_checkout(repo)
+
+                pbar.update(20)  # Almost done
                 pbar.set_postfix({"status": "finalizing"})
                 pbar.update(10)  # Complete
                 
@@ -0,0 +1,37 @@
+from git import Repo
+
+
+class RepoUpdater:
+    """Git side of incremental re-indexing: fetch, diff against the indexed SHA, check out."""
+
+    def head_sha(self, source_path: str) -> str:
+        return Repo(source_path).head.commit.hexsha
+
+    def fetch(self, source_path: str) -> str:
+        """Fetch origin and return the SHA of the remote tip of the current branch."""
+        repo = Repo(source_path)
+        repo.remotes.origin.fetch()
+        branch = repo.active_branch.name
+        return repo.commit(f"origin/{branch}").hexsha
+
+    def diff(self, source_path: str, old_sha: str, new_sha: str):
+        """
+        Returns (changed, deleted) repo-relative paths between two commits.
+        Renames are reported as delete + add.
+        """
+        repo = Repo(source_path)
+        output = repo.git.diff("--name-status", "--no-renames", old_sha, new_sha)
+
+        changed, deleted = [], []
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            status, path = line.split("\t", 1)
+            if status.startswith("D"):
+                deleted.append(path)
+            else:
+                changed.append(path)
+        return changed, deleted
+
+    def checkout(self, source_path: str, sha: str):
+        Repo(source_path).git.reset("--hard", sha)
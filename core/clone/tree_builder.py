@@ -1,4 +1,12 @@
+import hashlib
 import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fnmatch import fnmatch
+
+from reposurfer.config import TREE_MAX_FILE_BYTES, TREE_WORKERS
+from reposurfer.core.clone.gitignore import GitIgnore, gitignored
 
 IGNORE_DIRS={
     ".git",
@@ -9,36 +17,251 @@ IGNORE_DIRS={
     "build"   
 }
 
+# skipped when skip_generated is on
+VENDOR_DIRS = {
+    "vendor",
+    "third_party",
+    "site-packages",
+    "bower_components"
+}
+
+GENERATED_NAME_PATTERNS = (
+    "*.min.js",
+    "*.min.css",
+    "*.bundle.js",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.generated.*",
+    "*.lock",
+    "package-lock.json",
+)
+
+# only looked for in the comment lines a file starts with, where generators put them
+GENERATED_MARKERS = (
+    b"@generated",
+    b"DO NOT EDIT",
+    b"Code generated by",
+    b"autogenerated",
+    b"auto-generated",
+)
+
+COMMENT_PREFIXES = (b"#", b"//", b"/*", b"*", b"--", b"<!--", b";")
+
 EXTENSION_LANGUAGE_MAP = {
     ".py": "python",
     ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
     ".ts": "typescript",
+    ".tsx": "typescript",
     ".java": "java",
     ".cpp": "cpp",
+    ".cc": "cpp",
+    ".hpp": "cpp",
     ".c": "c",
+    ".h": "c",
     ".go": "go",
     ".rs": "rust",
     ".md": "markdown"
 }
 
+
+def sparse_patterns(include=None, exclude=None):
+    """
+    Build non-cone sparse-checkout patterns.
+    Defaults to every extension in EXTENSION_LANGUAGE_MAP when no include globs are given.
+    """
+    patterns = list(include) if include else [f"*{ext}" for ext in EXTENSION_LANGUAGE_MAP]
+    patterns += [_exclude_pattern(p) for p in (exclude or [])]
+    return patterns
+
+
+def _exclude_pattern(glob: str) -> str:
+    # a bare "!dir/" does not override a file-level "*.py" match, so exclude its contents
+    if glob.endswith("/"):
+        if "/" not in glob.strip("/"):
+            glob = "**/" + glob
+        glob += "**"
+    return "!" + glob
+
+
+def match_patterns(rel_path: str, patterns) -> bool:
+    """
+    gitignore-style matching used by sparse checkout: the last matching pattern wins,
+    patterns without a slash match any path component.
+    """
+    matched = False
+    parts = rel_path.split("/")
+    for pattern in patterns:
+        negate = pattern.startswith("!")
+        glob = (pattern[1:] if negate else pattern).strip("/")
+        if glob.startswith("**/"):
+            glob = glob[3:]
+            hit = any(fnmatch("/".join(parts[i:]), glob) for i in range(len(parts)))
+        elif "/" in glob:
+            hit = fnmatch(rel_path, glob) or fnmatch(rel_path, glob + "/*")
+        else:
+            hit = any(fnmatch(part, glob) for part in parts)
+        if hit:
+            matched = not negate
+    return matched
+
+
+def _header_comments(head: bytes):
+    """The comment lines at the top of a file, up to its first line of code."""
+    for line in head.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith(COMMENT_PREFIXES):
+            return
+        yield line
+
+
+def looks_generated(content: bytes) -> bool:
+    """Generated-file marker in the leading comments, or a minified file (a huge first line)."""
+    head = content[:4096]
+    if any(marker in line for line in _header_comments(head[:1024]) for marker in GENERATED_MARKERS):
+        return True
+    return len(head) == 4096 and head.count(b"\n") < 2
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
 class FileTreeBuilder:
-    def build_tree(self,repo_source_path: str):
+    def __init__(self, max_file_bytes=TREE_MAX_FILE_BYTES, skip_generated=True,
+                 use_gitignore=True, workers=TREE_WORKERS):
+        """
+        max_file_bytes: larger files are left out of the tree (0 disables the limit)
+        skip_generated: leave out vendored dirs, minified and generated files
+        use_gitignore:  honour .gitignore files at every level
+        workers:        threads scanning directories in parallel
+        """
+        self.max_file_bytes = max_file_bytes
+        self.skip_generated = skip_generated
+        self.use_gitignore = use_gitignore
+        self.workers = workers
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _skip(self, reason: str):
+        with self._stats_lock:
+            self.stats[reason] += 1
+
+    def build_entry(self, repo_source_path: str, rel_path: str, size: int = None):
+        """
+        Returns the tree.json entry with a content hash, or None when the file is
+        filtered out by the size / generated-file heuristics.
+        """
+        full_path = os.path.join(repo_source_path, rel_path)
+        if size is None:
+            size = os.path.getsize(full_path)
+        if self.max_file_bytes and size > self.max_file_bytes:
+            self._skip("oversized")
+            return None
+
+        name = rel_path.rsplit("/", 1)[-1]
+        if self.skip_generated and any(fnmatch(name, p) for p in GENERATED_NAME_PATTERNS):
+            self._skip("generated")
+            return None
+
+        try:
+            with open(full_path, "rb") as f:
+                content = f.read()
+        except OSError:
+            self._skip("unreadable")
+            return None
+
+        if self.skip_generated and looks_generated(content):
+            self._skip("generated")
+            return None
+
+        ext= os.path.splitext(name)[1]
+        language= EXTENSION_LANGUAGE_MAP.get(ext,"unknown")
+        return {
+            "path": rel_path,
+            "type": "file",
+            "extension": ext,
+            "language": language,
+            "size_bytes": size,
+            "hash": content_hash(content)
+        }
+
+    def is_ignored(self, rel_path: str, repo_source_path: str = None) -> bool:
+        """
+        True when build_tree would leave the file out: a pruned parent directory or,
+        given the checkout, a .gitignore rule. Size/generated checks are build_entry's.
+        """
+        parts = rel_path.split("/")
+        if any(self._prune_dir(part) for part in parts[:-1]):
+            return True
+        if not (self.use_gitignore and repo_source_path):
+            return False
+        # the same .gitignore stack _scan_dir builds on its way down to the file
+        ignores = []
+        for depth in range(len(parts)):
+            rel_dir = "/".join(parts[:depth])
+            gitignore = GitIgnore.from_file(os.path.join(repo_source_path, rel_dir, ".gitignore"), rel_dir)
+            if gitignore:
+                ignores = ignores + [gitignore]
+            if ignores and gitignored(ignores, "/".join(parts[:depth + 1]), depth < len(parts) - 1):
+                return True
+        return False
+
+    def _prune_dir(self, name: str) -> bool:
+        return name in IGNORE_DIRS or (self.skip_generated and name in VENDOR_DIRS)
+
+    def _scan_dir(self, repo_source_path: str, rel_dir: str, ignores, patterns):
+        """Scan one directory. Returns (file entries, [(subdir, gitignore stack)])."""
+        abs_dir = os.path.join(repo_source_path, rel_dir)
+        if self.use_gitignore:
+            gitignore = GitIgnore.from_file(os.path.join(abs_dir, ".gitignore"), rel_dir)
+            if gitignore:
+                ignores = ignores + [gitignore]
+
+        entries, subdirs = [], []
+        with os.scandir(abs_dir) as it:
+            for dir_entry in it:
+                rel_path = f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+
+                if dir_entry.is_dir(follow_symlinks=False):
+                    if self._prune_dir(dir_entry.name):
+                        continue
+                    if ignores and gitignored(ignores, rel_path, True):
+                        self._skip("gitignore")
+                        continue
+                    subdirs.append((rel_path, ignores))
+
+                elif dir_entry.is_file():
+                    if patterns and not match_patterns(rel_path, patterns):
+                        continue
+                    if ignores and gitignored(ignores, rel_path, False):
+                        self._skip("gitignore")
+                        continue
+                    entry = self.build_entry(repo_source_path, rel_path, dir_entry.stat().st_size)
+                    if entry:
+                        entries.append(entry)
+        return entries, subdirs
+
+    def build_tree(self,repo_source_path: str, patterns=None):
+        """
+        patterns: sparse-checkout patterns of the clone. Files outside them are
+        never materialized, so anything left over from an earlier full checkout is skipped.
+        """
+        self.stats = Counter()
         tree=[]
-        for root, dirs, files in os.walk(repo_source_path):
-            dirs[:]= [d for d in dirs if d not in IGNORE_DIRS]
-            
-            for name in files:
-                full_path = os.path.join(root,name)
-                rel_path = os.path.relpath(full_path,repo_source_path)
-                ext= os.path.splitext(name)[1]
-                language= EXTENSION_LANGUAGE_MAP.get(ext,"unknown")
-
-                tree.append({
-                    "path": rel_path.replace("\\", "/"),
-                    "type": "file",
-                    "extension": ext,
-                    "language": language,
-                    "size_bytes": os.path.getsize(full_path)
-                })
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._scan_dir, repo_source_path, "", [], patterns)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entries, subdirs = future.result()
+                    tree.extend(entries)
+                    for rel_dir, ignores in subdirs:
+                        pending.add(pool.submit(self._scan_dir, repo_source_path, rel_dir, ignores, patterns))
+
+        tree.sort(key=lambda e: e["path"])
         return tree
-    
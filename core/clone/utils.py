@@ -5,3 +5,44 @@ def save_json(path, data):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
+
+
+def load_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class JsonlWriter:
+    """Writes one JSON record per line so large collections never sit in memory."""
+
+    def __init__(self, path, append=False):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._f = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record):
+        self._f.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,66 @@
+import random
+import sys
+import time
+
+import numpy as np
+
+from reposurfer.core.catalog.repo_catalog import RepoCatalog
+from reposurfer.core.embeddings.embedding_backends import EMBED_BACKENDS
+from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
+
+
+def query_for_chunk(text: str) -> str:
+    """First docstring line of a chunk, else its header, as a stand-in for a user question."""
+    if "Docstring:\n" in text:
+        line = text.split("Docstring:\n", 1)[1].strip().split("\n", 1)[0]
+        if line:
+            return line
+    return text.split("\n", 1)[0]
+
+
+def sample_chunks(repo_path: str, sample: int, queries: int, seed: int = 0):
+    """A random sample of a repo's chunk texts and queries drawn from it."""
+    with RepoCatalog(repo_path) as catalog:
+        texts = [chunk["text"] for chunk in catalog.iter_chunks()]
+    rng = random.Random(seed)
+    texts = rng.sample(texts, min(sample, len(texts)))
+    query_texts = [query_for_chunk(text) for text in rng.sample(texts, min(queries, len(texts)))]
+    return texts, query_texts
+
+
+def run_backend_report(repo_path: str, backends=EMBED_BACKENDS, model_name="all-MiniLM-L6-v2",
+                       sample: int = 1000, queries: int = 100, top_k: int = 10, seed: int = 0):
+    """
+    Embed the same sample of a repo's chunks with every backend and report
+    load time, encoding throughput and recall@k against the first backend:
+    the share of its top-k chunks per query that each backend also returns.
+    """
+    texts, query_texts = sample_chunks(repo_path, sample, queries, seed)
+    print(f"[Report] {len(texts)} chunks, {len(query_texts)} queries, top {top_k}")
+
+    rows, reference = [], None
+    for backend in backends:
+        start = time.perf_counter()
+        with EmbeddingGenerator(model_name, use_cache=False, backend=backend) as embedder:
+            load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vectors = embedder.embed(texts)
+            encode_seconds = time.perf_counter() - start
+            query_vectors = embedder.embed(query_texts, cache=False)
+
+        k = min(top_k, len(texts))
+        ranked = np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :k]
+        if reference is None:
+            reference = ranked
+        recall = np.mean([len(set(r) & set(ref)) / k for r, ref in zip(ranked, reference)]) if k else 0.0
+        rows.append((backend, load_seconds, len(texts) / max(encode_seconds, 1e-9), recall))
+
+    print(f"{'backend':<24}{'load s':>10}{'chunks/s':>12}{f'recall@{top_k}':>12}")
+    for backend, load_seconds, throughput, recall in rows:
+        print(f"{backend:<24}{load_seconds:>10.1f}{throughput:>12.1f}{recall:>12.3f}")
+    return rows
+
+
+if __name__ == "__main__":
+    run_backend_report(sys.argv[1] if len(sys.argv) > 1 else "storage/repos/psf__requests")
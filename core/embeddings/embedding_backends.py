@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from reposurfer.config import CACHE_STORAGE_PATH
+
+EMBED_BACKENDS = ("sentence-transformers", "onnx", "onnx-int8")
+# files of a local model directory that decide its vectors
+MODEL_FILE_SUFFIXES = (".json", ".txt", ".safetensors", ".bin", ".onnx")
+
+
+def _repo_id(model_name: str) -> str:
+    if "/" in model_name or os.path.isdir(model_name):
+        return model_name
+    return f"sentence-transformers/{model_name}"
+
+
+def _model_file(model_name: str, filename: str) -> str:
+    """Path of one file of the model: inside a local model directory, else downloaded from the hub."""
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, filename)
+    from huggingface_hub import hf_hub_download
+
+    return hf_hub_download(_repo_id(model_name), filename)
+
+
+def model_revision(model_name: str):
+    """
+    Short id of the weights behind `model_name`: the commit of its cached
+    hub snapshot, or a hash of a local model directory's config and weight
+    files. None if the model is not on disk.
+    """
+    if os.path.isdir(model_name):
+        digest = hashlib.blake2b(digest_size=6)
+        for root, dirs, names in os.walk(model_name):
+            dirs.sort()
+            for name in sorted(names):
+                if name.endswith(MODEL_FILE_SUFFIXES):
+                    digest.update(os.path.relpath(os.path.join(root, name), model_name).encode("utf-8"))
+                    with open(os.path.join(root, name), "rb") as f:
+                        for block in iter(lambda: f.read(1 << 20), b""):
+                            digest.update(block)
+        return digest.hexdigest()
+
+    from huggingface_hub import try_to_load_from_cache
+
+    path = try_to_load_from_cache(_repo_id(model_name), "config.json")
+    parts = os.path.normpath(path).split(os.sep) if isinstance(path, str) else []
+    if "snapshots" not in parts[:-1]:
+        return None
+    return parts[parts.index("snapshots") + 1][:12]
+
+
+class SentenceTransformerBackend:
+    """PyTorch SentenceTransformer; the reference backend."""
+
+    def __init__(self, model_name: str, threads: int = 0):
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+        self.revision = model_revision(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        # the model truncates past max_seq_length; leave room for [CLS]/[SEP]
+        self.max_tokens = self.model.max_seq_length - 2
+
+    def offsets(self, texts):
+        """Character spans of every token, no special tokens and no truncation."""
+        encoded = self.model.tokenizer(list(texts), add_special_tokens=False, truncation=False,
+                                       return_offsets_mapping=True)
+        return encoded["offset_mapping"]
+
+    def encode(self, texts):
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress_bar=False,
+            normalize_embeddings=True
+        )
+
+
+class OnnxBackend:
+    """
+    The same sentence-transformers model run by ONNX Runtime, without
+    importing torch. The model's onnx/model.onnx export and tokenizer come
+    from the Hugging Face hub or a local model directory. With quantize=True
+    the graph is dynamically quantized to int8 once and kept in
+    storage/cache/onnx.
+    """
+
+    def __init__(self, model_name: str, quantize: bool = False, threads: int = 0,
+                 cache_dir=os.path.join(CACHE_STORAGE_PATH, "onnx")):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        repo_id = _repo_id(model_name)
+        files = {
+            name: _model_file(model_name, name)
+            for name in ("onnx/model.onnx", "tokenizer.json",
+                         "sentence_bert_config.json", "1_Pooling/config.json")
+        }
+        self.revision = model_revision(model_name)
+        model_path = files["onnx/model.onnx"]
+        if quantize:
+            # one int8 graph per revision, so updated weights are quantized afresh
+            model_path = self._quantized(model_path, os.path.join(cache_dir, repo_id.replace("/", "__"),
+                                                                  self.revision or "unknown"))
+
+        with open(files["sentence_bert_config.json"], "r", encoding="utf-8") as f:
+            max_seq_length = json.load(f).get("max_seq_length")
+        if max_seq_length is None:
+            # models saved by sentence-transformers 6 keep the limit in the tokenizer config only
+            with open(_model_file(model_name, "tokenizer_config.json"), "r", encoding="utf-8") as f:
+                max_seq_length = min(json.load(f).get("model_max_length", 512), 512)
+        with open(files["1_Pooling/config.json"], "r", encoding="utf-8") as f:
+            pooling = json.load(f)
+        # older exports flag each mode, newer ones name it
+        self.cls_pooling = pooling.get("pooling_mode") == "cls" or pooling.get("pooling_mode_cls_token", False)
+
+        self.name = f"{model_name}-onnx{'-int8' if quantize else ''}"
+        self.max_tokens = max_seq_length - 2
+
+        # one tokenizer for the model input, one untruncated copy for offsets
+        self.tokenizer = Tokenizer.from_file(files["tokenizer.json"])
+        self.tokenizer.enable_truncation(max_seq_length)
+        self.tokenizer.enable_padding()
+        self.offset_tokenizer = Tokenizer.from_file(files["tokenizer.json"])
+        self.offset_tokenizer.no_truncation()
+        self.offset_tokenizer.no_padding()
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    @staticmethod
+    def _quantized(model_path: str, cache_dir: str) -> str:
+        quantized_path = os.path.join(cache_dir, "model.int8.onnx")
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print(f"[Embeddings] Quantizing {model_path} to int8...")
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{quantized_path}.{os.getpid()}.tmp"
+            quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, quantized_path)
+        return quantized_path
+
+    def offsets(self, texts):
+        """Character spans of every token, no special tokens and no truncation."""
+        return [e.offsets for e in self.offset_tokenizer.encode_batch(list(texts), add_special_tokens=False)]
+
+    def encode(self, texts):
+        encoded = self.tokenizer.encode_batch(list(texts))
+        mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encoded], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encoded], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+
+        if self.cls_pooling:
+            pooled = hidden[:, 0]
+        else:
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class BackendTokenizer:
+    """
+    Only a backend's offsets(), for a process that leaves encoding to an
+    embedding pool and so holds no model of its own.
+    """
+
+    def __init__(self, backend: str, model_name: str):
+        if backend == "sentence-transformers":
+            from transformers import AutoTokenizer
+
+            self.tokenizer = AutoTokenizer.from_pretrained(_repo_id(model_name))
+            self.fast = None
+        elif backend in ("onnx", "onnx-int8"):
+            from tokenizers import Tokenizer
+
+            self.tokenizer = None
+            self.fast = Tokenizer.from_file(_model_file(model_name, "tokenizer.json"))
+            self.fast.no_truncation()
+            self.fast.no_padding()
+        else:
+            raise ValueError(f"unknown embedding backend {backend!r}, expected one of {', '.join(EMBED_BACKENDS)}")
+
+    def offsets(self, texts):
+        """Character spans of every token, no special tokens and no truncation."""
+        if self.fast is not None:
+            return [e.offsets for e in self.fast.encode_batch(list(texts), add_special_tokens=False)]
+        encoded = self.tokenizer(list(texts), add_special_tokens=False, truncation=False,
+                                 return_offsets_mapping=True)
+        return encoded["offset_mapping"]
+
+
+def load_backend(backend: str, model_name: str, threads: int = 0):
+    """`threads` caps the backend's intra-op threads; 0 leaves the library default."""
+    if backend == "sentence-transformers":
+        return SentenceTransformerBackend(model_name, threads)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxBackend(model_name, quantize=backend == "onnx-int8", threads=threads)
+    raise ValueError(f"unknown embedding backend {backend!r}, expected one of {', '.join(EMBED_BACKENDS)}")
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked
+    fcntl = None
+
+from reposurfer.config import CACHE_STORAGE_PATH
+
+EMBEDDING_CACHE_VERSION = 1
+
+# index lines are fixed width: 32 hex digits and a newline
+_LINE_BYTES = 33
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by the hash of the exact text that was encoded, one
+    directory per model and revision. Vectors are appended as float16 rows to
+    vectors.f16 and their hashes, one per line, to index.txt, so line n of
+    the index is row n of the matrix. Texts are not tied to a repo, so
+    unchanged chunks are never re-encoded, in any repo. Processes sharing
+    the cache append under a file lock.
+    """
+
+    def __init__(self, model_name: str, dim: int, revision: str = None,
+                 cache_dir=os.path.join(CACHE_STORAGE_PATH, "embeddings")):
+        # updated weights under the same model name must not hit vectors of the old ones
+        model_slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{model_name}@{revision}" if revision else model_name)
+        self.cache_dir = os.path.join(cache_dir, f"v{EMBEDDING_CACHE_VERSION}", f"{model_slug}-{dim}")
+        self.dim = dim
+        self.vectors_path = os.path.join(self.cache_dir, "vectors.f16")
+        self.index_path = os.path.join(self.cache_dir, "index.txt")
+        self.lock_path = os.path.join(self.cache_dir, "lock")
+        self.hits = 0
+        self.misses = 0
+        self.rows = {}
+        self._stored = 0  # rows of the files read into self.rows
+        self._read_index()
+        self._matrix = None
+
+    def _complete_rows(self) -> int:
+        # an interrupted append leaves a partial tail in either file; only complete pairs count
+        if not os.path.exists(self.index_path) or not os.path.exists(self.vectors_path):
+            return 0
+        return min(os.path.getsize(self.index_path) // _LINE_BYTES,
+                   os.path.getsize(self.vectors_path) // (self.dim * 2))
+
+    def _read_index(self):
+        """Pick up rows appended since the last read, by this or another process."""
+        stored = self._complete_rows()
+        if stored <= self._stored:
+            return stored
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            f.seek(self._stored * _LINE_BYTES)
+            hashes = f.read((stored - self._stored) * _LINE_BYTES).split()
+        for row, h in enumerate(hashes, self._stored):
+            self.rows.setdefault(h, row)
+        self._stored = stored
+        return stored
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _open_matrix(self):
+        if self._matrix is None or len(self._matrix) < self._stored:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float16, mode="r",
+                                     shape=(os.path.getsize(self.vectors_path) // (self.dim * 2), self.dim))
+        return self._matrix
+
+    def get(self, hashes):
+        """Returns (float32 vectors of the hits, positions in `hashes` that missed)."""
+        found, missing = [], []
+        for position, h in enumerate(hashes):
+            if h in self.rows:
+                found.append(position)
+            else:
+                missing.append(position)
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        vectors = np.zeros((len(hashes), self.dim), dtype=np.float32)
+        if found:
+            matrix = self._open_matrix()
+            vectors[found] = matrix[[self.rows[hashes[i]] for i in found]]
+        return vectors, missing
+
+    def put(self, hashes, vectors):
+        new = {}
+        for h, vector in zip(hashes, vectors):
+            if h not in self.rows and h not in new:
+                new[h] = vector
+        if not new:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._locked():
+            # the files may have grown since this process read them; row numbers come from disk
+            stored = self._read_index()
+            new = {h: vector for h, vector in new.items() if h not in self.rows}
+            if not new:
+                return
+            # cut off the tail of an interrupted append so line n still matches row n
+            for path, row_bytes in ((self.vectors_path, self.dim * 2), (self.index_path, _LINE_BYTES)):
+                if os.path.exists(path):
+                    with open(path, "r+b") as f:
+                        f.truncate(stored * row_bytes)
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.asarray(list(new.values()), dtype=np.float16).tobytes())
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{h}\n" for h in new))
+            for row, h in enumerate(new, stored):
+                self.rows[h] = row
+            self._stored = stored + len(new)
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({ratio:.0%} hit rate), {len(self.rows)} stored"
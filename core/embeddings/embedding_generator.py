@@ -1,13 +1,173 @@
-from sentence_transformers import SentenceTransformer
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from tqdm import tqdm
+
+from reposurfer.config import (
+    EMBED_BACKEND, EMBED_BATCH_TOKENS, EMBED_WINDOW_OVERLAP, EMBED_WORKER_THREADS, EMBED_WORKERS,
+    USE_EMBED_CACHE,
+)
+from reposurfer.core.embeddings.embedding_backends import BackendTokenizer, load_backend
+from reposurfer.core.embeddings.embedding_cache import EmbeddingCache, text_hash
+
+# the model loaded once per pool worker
+_worker_backend = None
+
+
+def _init_worker(backend: str, model_name: str, threads: int):
+    global _worker_backend
+    _worker_backend = load_backend(backend, model_name, threads)
+
+
+def _encode_batch(texts):
+    return _worker_backend.encode(texts)
+
+
+def _backend_info():
+    return _worker_backend.name, _worker_backend.revision, _worker_backend.dim, _worker_backend.max_tokens
+
 
 class EmbeddingGenerator:
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
-        self.dim = self.model.get_sentence_embedding_dimension()
-
-    def embed(self, texts):
-        return self.model.encode(
-            texts,
-            show_progress_bar=True,
-            normalize_embeddings=True
-        )
+    def __init__(self, model_name="all-MiniLM-L6-v2", batch_tokens: int = EMBED_BATCH_TOKENS,
+                 use_cache: bool = USE_EMBED_CACHE, backend: str = EMBED_BACKEND,
+                 workers: int = EMBED_WORKERS, worker_threads: int = EMBED_WORKER_THREADS):
+        self.batch_tokens = batch_tokens
+        self.model_name = model_name
+        self.backend_name = backend
+        self.workers = workers
+        # split the cores between workers instead of letting each one grab all of them
+        self.worker_threads = worker_threads or max(1, (os.cpu_count() or 1) // workers)
+        self._pool = None
+
+        # sentence-transformers (PyTorch), onnx or onnx-int8 (ONNX Runtime)
+        if workers > 1:
+            # the pool encodes; this process only tokenizes, for lengths and windows
+            self.backend = None
+            self.tokenizer = BackendTokenizer(backend, model_name)
+            try:
+                self.name, self.revision, self.dim, self.max_tokens = self._get_pool().submit(_backend_info).result()
+            except BaseException:
+                self.close()
+                raise
+        else:
+            self.backend = self.tokenizer = load_backend(backend, model_name)
+            self.name, self.revision = self.backend.name, self.backend.revision
+            self.dim, self.max_tokens = self.backend.dim, self.backend.max_tokens
+        # backends and model revisions produce different vectors, so each gets its own cache
+        self.cache = EmbeddingCache(self.name, self.dim, self.revision) if use_cache else None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn, not fork: forking a process that has loaded torch can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.backend_name, self.model_name, self.worker_threads),
+            )
+        return self._pool
+
+    def close(self):
+        """Stop the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def token_lengths(self, texts):
+        return [len(offsets) for offsets in self.tokenizer.offsets(texts)]
+
+    def split(self, text: str, overlap: int = EMBED_WINDOW_OVERLAP):
+        """
+        Split a chunk that exceeds the model's sequence length into windows of
+        at most max_tokens tokens overlapping by `overlap`, so nothing past the
+        truncation point is lost. Later windows repeat the chunk's first line
+        ("Method X defined in file") for context, unless it would take up more
+        than half a window. Returns (window, token count) pairs; pass the
+        counts to embed() so the windows are not tokenized again.
+        """
+        offsets = self.tokenizer.offsets([text])[0]
+        if len(offsets) <= self.max_tokens:
+            return [(text, len(offsets))]
+
+        header = text.split("\n", 1)[0]
+        header_tokens = self.token_lengths([header])[0]
+        size = self.max_tokens - header_tokens - 1
+        if size < self.max_tokens // 2:
+            header, header_tokens, size = None, 0, self.max_tokens
+        step = max(1, size - overlap)
+
+        windows = []
+        for start in range(0, len(offsets), step):
+            end = min(start + size, len(offsets))
+            piece = text[offsets[start][0]:offsets[end - 1][1]]
+            if start == 0 or header is None:
+                windows.append((piece, end - start))
+            else:
+                windows.append((f"{header}\n{piece}", header_tokens + end - start))
+            if end == len(offsets):
+                break
+        return windows
+
+    def embed(self, texts, lengths=None, cache: bool = True, progress: bool = True):
+        """
+        Vectors for `texts` in input order. Texts found in the embedding cache
+        are not encoded again; the rest are encoded and added to it. Pass
+        cache=False for one-off texts such as queries.
+        """
+        texts = list(texts)
+        if self.cache is None or not cache:
+            return self._encode(texts, lengths, progress)
+
+        hashes = [text_hash(text) for text in texts]
+        vectors, missing = self.cache.get(hashes)
+        if missing:
+            encoded = self._encode([texts[i] for i in missing],
+                                   [lengths[i] for i in missing] if lengths else None, progress)
+            vectors[missing] = encoded
+            self.cache.put([hashes[i] for i in missing], encoded)
+        return vectors
+
+    def _encode(self, texts, lengths=None, progress: bool = True):
+        """
+        Encode in batches of similar token length: inputs are sorted by length
+        and cut into batches of at most `batch_tokens` padded tokens, then the
+        vectors are put back in input order. With workers > 1 the batches are
+        sharded across a pool of processes that each hold their own model.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return vectors
+        lengths = lengths or self.token_lengths(texts)
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+
+        batches, batch = [], []
+        for i in order:
+            padded = min(lengths[i], self.max_tokens) + 2
+            if batch and (len(batch) + 1) * padded > self.batch_tokens:
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        batches.append(batch)
+
+        with tqdm(total=len(texts), desc="Embedding", unit="text", disable=not progress or len(texts) < 2) as pbar:
+            if self.backend is not None:
+                for batch in batches:
+                    vectors[batch] = self.backend.encode([texts[i] for i in batch])
+                    pbar.update(len(batch))
+                return vectors
+
+            pool = self._get_pool()
+            futures = {pool.submit(_encode_batch, [texts[i] for i in batch]): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                vectors[batch] = future.result()
+                pbar.update(len(batch))
+        return vectors
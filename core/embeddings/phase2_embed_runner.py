@@ -1,57 +1,259 @@
 import json
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
 from tqdm import tqdm
+from reposurfer.config import EMBED_STREAM_BATCH, QDRANT_URL, VECTOR_DIM, VECTOR_DTYPE
+from reposurfer.core.catalog.repo_catalog import RepoCatalog
+from reposurfer.core.clone.utils import load_json
 from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
-from reposurfer.core.embeddings.vector_store import VectorStore
+from reposurfer.core.embeddings.vector_projection import VectorProjection
+from reposurfer.core.embeddings.vector_store import VectorStore, point_id
 
-def run_embedding(repo_path: str):
-    print(f"[Phase2.3] Starting embedding generation...")
-    
-    with open(f"{repo_path}/symbol_chunks.json") as f:
-        chunks = json.load(f)
-    
-    repo_name = repo_path.split("/")[-1]
-    texts = [c["text"] for c in chunks]
-    ids = list(range(len(texts)))
+EMBED_CHECKPOINT_FILE = "embedding_checkpoint.json"
+# bodies embedded to fit a PCA projection when REPOSURFER_VECTOR_DIM is set
+PCA_SAMPLE = 4096
+
+
+def _group_chunks(chunks):
+    """
+    Chunks grouped by content hash, in first-seen order. Each group is
+    embedded once from its first chunk; the rest share that vector.
+    """
+    groups = {}
+    for chunk in chunks:
+        groups.setdefault(chunk["content_hash"], []).append(chunk)
+    return list(groups.values())
+
+
+def _split_chunks(embedder: EmbeddingGenerator, groups):
+    """One (group, window index, text, token count) per embedding window; most chunks fit in one."""
+    return [
+        (group, window, text, length)
+        for group in groups
+        for window, (text, length) in enumerate(embedder.split(group[0]["text"]))
+    ]
+
+
+def _embed_windows(embedder: EmbeddingGenerator, windows, progress: bool = True):
+    # the token counts from splitting spare embed() a second tokenization
+    return embedder.embed([text for _, _, text, _ in windows], [length for *_, length in windows],
+                          progress=progress)
+
+
+def _points(windows):
+    # one point per (body, window): ids follow the content hash, so any copy re-creates the same point
+    ids = [point_id(group[0]["content_hash"], str(w)) for group, w, *_ in windows]
     payloads = [
         {
-            "symbol_id": c["symbol_id"],
-            "symbol_type": c["symbol_type"],
-            "file": c["file"]
+            "symbol_id": group[0]["symbol_id"],
+            "symbol_type": group[0]["symbol_type"],
+            "file": group[0]["file"],
+            "window": w,
+            "content_hash": group[0]["content_hash"],
+            # every symbol with this body, first one included
+            "symbols": [
+                {"symbol_id": c["symbol_id"], "symbol_type": c["symbol_type"], "file": c["file"]}
+                for c in group
+            ],
+            "files": sorted({c["file"] for c in group})
         }
-        for c in chunks
+        for group, w, *_ in windows
     ]
+    return ids, payloads
 
-    print(f"[Phase2.3] Processing {len(chunks)} symbol chunks...")
-    
-    # Progress bar for embedding generation
-    embedder = EmbeddingGenerator()
-    
-    # Generate all embeddings at once (more efficient)
-    print(f"[Phase2.3] Generating embeddings for {len(texts)} chunks...")
-    vectors = embedder.embed(texts)
+
+def _store_chunks(store: VectorStore, windows, vectors):
+    ids, payloads = _points(windows)
+    store.upload(ids, vectors, payloads)
+
+
+def _iter_group_batches(chunks, batch_size: int):
+    """Lists of up to `batch_size` whole groups from a content-hash ordered chunk stream."""
+    batch = []
+    for _, group in groupby(chunks, key=lambda chunk: chunk["content_hash"]):
+        batch.append(list(group))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load_checkpoint(path: str):
+    try:
+        return load_json(path, None)
+    except ValueError:
+        return None
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _fit_projection(repo_path: str, embedder: EmbeddingGenerator, catalog: RepoCatalog, dim: int):
+    """
+    PCA fitted on the first PCA_SAMPLE bodies in content-hash order, which is
+    an unbiased sample of the repo. Returns the projection (None if there
+    are too few vectors) and the sample as an embedded (groups, windows,
+    vectors) batch, which becomes the first stream batch.
+    """
+    groups = next(_iter_group_batches(catalog.iter_chunks_by_hash(), PCA_SAMPLE), [])
+    windows = _split_chunks(embedder, groups)
+    sample = _embed_windows(embedder, windows, progress=False)
+    batch = (groups, windows, sample) if groups else None
+    if len(sample) < dim:
+        print(f"[Phase2.3] ⚠️ Only {len(sample)} vectors, storing full {embedder.dim}-dimensional vectors")
+        VectorProjection.remove(repo_path)
+        return None, batch
+
+    projection = VectorProjection.fit(sample, dim)
+    projection.save(repo_path)
+    print(f"[Phase2.3] 📉 Fitted a {embedder.dim} → {dim} PCA projection on {len(sample)} vectors")
+    return projection, batch
+
+
+def _embedded_batches(embedder: EmbeddingGenerator, catalog: RepoCatalog, after, batch_size: int, first=None):
+    """
+    (groups, windows, vectors) per stream batch of bodies after `after`.
+    `first` is a batch embedded already, the PCA sample; the stream continues past it.
+    """
+    if first is not None:
+        yield first
+        after = first[0][-1][0]["content_hash"]
+    for groups in _iter_group_batches(catalog.iter_chunks_by_hash(after), batch_size):
+        # Chunks longer than the model's sequence length become overlapping windows
+        windows = _split_chunks(embedder, groups)
+        yield groups, windows, _embed_windows(embedder, windows, progress=False)
+
+
+def run_embedding(repo_path: str, batch_size: int = EMBED_STREAM_BATCH, vector_dim: int = VECTOR_DIM):
+    """
+    Streams bodies from the catalog in content-hash order, `batch_size` at a
+    time. A background writer upserts each batch while the next one is
+    encoded, then checkpoints the last stored hash. An interrupted run
+    resumes after the checkpoint if the chunks and the model are unchanged.
+    With vector_dim set below the model dimension, vectors are stored
+    through a PCA projection fitted on a sample of the repo.
+    """
+    print(f"[Phase2.3] Starting embedding generation...")
+    if VECTOR_DTYPE == "float16" and not QDRANT_URL:
+        print("[Phase2.3] ⚠️ REPOSURFER_VECTOR_DTYPE=float16 needs a Qdrant server (REPOSURFER_QDRANT_URL); "
+              "local storage keeps float32 vectors (use REPOSURFER_VECTOR_DIM to shrink them)")
     
-    print(f"[Phase2.3] Storing vectors in database...")
+    repo_name = repo_path.split("/")[-1]
+    checkpoint_path = os.path.join(repo_path, EMBED_CHECKPOINT_FILE)
     store = VectorStore(collection_name=repo_name)
-    store.create(vector_size=len(vectors[0]))
-    
-    # Store in batches of 100
-    batch_size = 100
-    total_batches = (len(ids) + batch_size - 1) // batch_size
-    
-    with tqdm(range(total_batches), desc="Storing in database", unit="batch") as pbar:
-        for i in pbar:
-            start_idx = i * batch_size
-            end_idx = min((i + 1) * batch_size, len(ids))
-            
-            batch_ids = ids[start_idx:end_idx]
-            batch_vectors = vectors[start_idx:end_idx]
-            batch_payloads = payloads[start_idx:end_idx]
-            
-            store.upsert(batch_ids, batch_vectors, batch_payloads)
-            pbar.set_postfix({"stored": end_idx, "total": len(ids)})
-
-    print(f"[Phase2.3] ✅ Embedded and stored {len(vectors)} symbols")
+
+    # the context stops embedding workers even when a batch fails
+    with EmbeddingGenerator() as embedder, RepoCatalog(repo_path) as catalog:
+        fingerprint = {
+            "chunks": catalog.chunks_fingerprint(),
+            "model": embedder.name,
+            "revision": embedder.revision,
+            # local storage keeps float32 whatever the dtype, so only a server's dtype counts
+            "vectors": f"{VECTOR_DTYPE}-{vector_dim}" if QDRANT_URL else vector_dim,
+        }
+        checkpoint = _load_checkpoint(checkpoint_path)
+        sample = None  # the PCA sample, embedded already, when a projection is fitted
+        if checkpoint and checkpoint["fingerprint"] == fingerprint and store.client.collection_exists(repo_name):
+            after, done = checkpoint["last_hash"], checkpoint["bodies"]
+            projection = VectorProjection.load(repo_path)
+            print(f"[Phase2.3] ⏩ Resuming after {done} stored bodies")
+        else:
+            after, done = None, 0
+            projection = None
+            if 0 < vector_dim < embedder.dim:
+                projection, sample = _fit_projection(repo_path, embedder, catalog, vector_dim)
+            else:
+                VectorProjection.remove(repo_path)
+            store.reset(vector_size=projection.dim if projection else embedder.dim)
+
+        # Identical bodies (vendored copies, generated stubs, fixtures) are embedded once
+        total = catalog.count_bodies()
+        print(f"[Phase2.3] Processing {catalog.count_chunks()} symbol chunks ({total} unique bodies)...")
+
+        failed = []
+
+        def write(windows, vectors, checkpoint):
+            if failed:
+                return  # an earlier batch was lost; the checkpoint must not move past it
+            try:
+                ids, payloads = _points(windows)
+                store.upload(ids, vectors, payloads)
+                _save_checkpoint(checkpoint_path, checkpoint)
+            except BaseException:
+                failed.append(checkpoint["bodies"])
+                raise
+
+        stored = 0
+        pending = deque()
+        # the index is built once after the load rather than alongside every batch
+        with store.bulk_ingest(), ThreadPoolExecutor(max_workers=1) as writer, \
+                tqdm(total=total, initial=done, desc="Embedding bodies", unit="body") as pbar:
+            # with an embedding pool, each stream batch has enough work for every worker
+            for groups, windows, vectors in _embedded_batches(embedder, catalog, after,
+                                                              batch_size * embedder.workers, sample):
+                if projection is not None:
+                    vectors = projection.apply(vectors)
+                done += len(groups)
+                stored += len(vectors)
+
+                # one batch is written while the next encodes; never more than two wait
+                while len(pending) >= 2:
+                    pending.popleft().result()
+                pending.append(writer.submit(write, windows, vectors, {
+                    "fingerprint": fingerprint,
+                    "last_hash": groups[-1][0]["content_hash"],
+                    "bodies": done,
+                }))
+                pbar.update(len(groups))
+            while pending:
+                pending.popleft().result()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if embedder.cache is not None:
+        print(f"[Phase2.3] 💾 Embedding cache: {embedder.cache.report()}")
+    print(f"[Phase2.3] ✅ Embedded and stored {stored} vectors for {done} unique bodies")
+
+
+def update_embedding(repo_path: str, new_chunks, touched_paths):
+    """
+    Incremental Phase 2.3: delete the vectors of changed/deleted files
+    and embed only the rebuilt chunks. A vector shared with other files
+    goes too, so every body it covered is regrouped from the catalog.
+    """
+    repo_name = repo_path.split("/")[-1]
+    store = VectorStore(collection_name=repo_name)
+    projection = VectorProjection.load(repo_path)
+
+    with EmbeddingGenerator() as embedder:
+        store.create(vector_size=projection.dim if projection else embedder.dim)
+
+        touched_paths = list(touched_paths)
+        hashes = {p.get("content_hash") for p in store.payloads_for_files(touched_paths, ["content_hash"])}
+        hashes.update(c["content_hash"] for c in new_chunks)
+        hashes.discard(None)
+
+        store.delete_files(touched_paths)
+        with RepoCatalog(repo_path) as catalog:
+            groups = _group_chunks(catalog.chunks_with_hashes(hashes))
+        if groups:
+            windows = _split_chunks(embedder, groups)
+            vectors = _embed_windows(embedder, windows)
+            if projection is not None:
+                vectors = projection.apply(vectors)
+            _store_chunks(store, windows, vectors)
+            if embedder.cache is not None:
+                print(f"[Phase2.3] 💾 Embedding cache: {embedder.cache.report()}")
+
+    print(f"[Phase2.3] 🔁 Re-embedded {len(groups)} unique bodies for {len(new_chunks)} changed symbols")
+
 
 if __name__ == "__main__":
     run_embedding("storage/repos/psf__requests")
@@ -1,36 +1,55 @@
-import json
 import os
 from tqdm import tqdm
-from reposurfer.core.embeddings.symbol_chunk_builder import SymbolChunkBuilder
+from reposurfer.config import CHUNK_WORKERS
+from reposurfer.core.catalog.repo_catalog import RepoCatalog
+from reposurfer.core.embeddings.symbol_chunk_builder import iter_file_chunks
+from reposurfer.core.symbol_graph.symbol_loader import SYMBOLS_FILE, iter_symbol_files
 
-def run_phase2(repo_path: str):
+def run_phase2(repo_path: str, workers: int = CHUNK_WORKERS):
+    """
+    Chunks are built from the spans recorded in symbols.jsonl, one file at a
+    time (in parallel across files when workers > 1), and written to the
+    catalog as they arrive, so memory does not grow with the repo.
+    """
     print(f"[Phase2] Starting symbol chunking...")
     
-    graph_path = os.path.join(repo_path, "symbol_graph.json")
+    # Progress bar for chunk building, one symbols.jsonl file record at a time
+    files = iter_symbol_files(os.path.join(repo_path, SYMBOLS_FILE))
+    total = 0
+    with RepoCatalog(repo_path) as catalog, catalog.transaction(), \
+            tqdm(iter_file_chunks(repo_path, files, workers), desc="Building symbol chunks", unit="file") as pbar:
+        catalog.clear_chunks()
+        for _, chunks in pbar:
+            catalog.write_chunks(chunks)
+            total += len(chunks)
+            pbar.set_postfix({"chunks": total})
 
-    with open(graph_path, "r") as f:
-        symbol_graph = json.load(f)
+    print(f"[Phase2] Built {total} symbol chunks")
 
-    nodes = symbol_graph.get("nodes", [])
-    print(f"[Phase2] Processing {len(nodes)} symbol nodes...")
 
-    builder = SymbolChunkBuilder(repo_path)
-    
-    # Progress bar for chunk building
-    with tqdm(nodes, desc="Building symbol chunks", unit="node") as pbar:
-        chunks = []
-        for node in pbar:
-            if node["type"] in {"class", "method", "function"}:
-                chunk = builder._build_chunk(node)
-                if chunk:
-                    chunks.append(chunk)
-            pbar.set_postfix({"chunks": len(chunks), "valid": node["type"] in {"class", "method", "function"}})
+def update_phase2(repo_path: str, changed_paths, deleted_paths):
+    """
+    Incremental Phase 2: rebuild chunks only for symbols in changed files.
+    Returns the new chunks so they can be embedded.
+    """
+    changed = set(changed_paths)
+    touched = changed | set(deleted_paths)
 
-    out_path = os.path.join(repo_path, "symbol_chunks.json")
-    with open(out_path, "w") as f:
-        json.dump(chunks, f, indent=2)
+    files = (
+        (record, rows)
+        for record, rows in iter_symbol_files(os.path.join(repo_path, SYMBOLS_FILE))
+        if record["path"] in changed
+    )
+    new_chunks = []
+    with RepoCatalog(repo_path) as catalog, catalog.transaction():
+        catalog.clear_chunks(touched)
+        for _, chunks in iter_file_chunks(repo_path, files, CHUNK_WORKERS if len(changed) > 1 else 1):
+            new_chunks.extend(chunks)
+        catalog.write_chunks(new_chunks)
+        total = catalog.count_chunks()
 
-    print(f"[Phase2] Built {len(chunks)} symbol chunks")
+    print(f"[Phase2] 🔁 Rebuilt {len(new_chunks)} symbol chunks, {total} total")
+    return new_chunks
 
 if __name__ == "__main__":
     run_phase2("storage/repos/psf__requests")
@@ -0,0 +1,58 @@
+import sys
+
+import numpy as np
+
+from reposurfer.core.embeddings.backend_report import sample_chunks
+from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
+from reposurfer.core.embeddings.vector_projection import VectorProjection
+
+
+def _top_k(query_vectors, vectors, k: int):
+    return np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :k]
+
+
+def run_storage_report(repo_path: str, dims=None, model_name="all-MiniLM-L6-v2",
+                       sample: int = 2000, queries: int = 200, top_k: int = 10, seed: int = 0):
+    """
+    Recall@k and size of every vector storage option on the same sample of a
+    repo's chunks: float32 and float16, at full dimension and through PCA
+    projections to `dims` (default: half and a quarter of the model
+    dimension). Recall is measured against full-dimension float32 rankings.
+    The projections are fitted on one half of the sample and scored on the
+    other, so their recall is out-of-sample.
+    """
+    texts, query_texts = sample_chunks(repo_path, sample, queries, seed)
+    with EmbeddingGenerator(model_name, use_cache=False) as embedder:
+        vectors = embedder.embed(texts)
+        query_vectors = embedder.embed(query_texts, cache=False)
+    # the sample is in random order already
+    fit_vectors, vectors = vectors[:len(vectors) // 2], vectors[len(vectors) // 2:]
+
+    k = min(top_k, len(vectors))
+    reference = _top_k(query_vectors, vectors, k)
+    dims = dims or [embedder.dim // 2, embedder.dim // 4]
+    print(f"[Report] {len(vectors)} chunks scored, PCA fitted on {len(fit_vectors)} others, "
+          f"{len(query_texts)} queries, top {top_k}")
+
+    rows = []
+    for dim in [embedder.dim, *(d for d in dims if d < embedder.dim and d <= len(fit_vectors))]:
+        stored, queried = vectors, query_vectors
+        if dim < embedder.dim:
+            projection = VectorProjection.fit(fit_vectors, dim)
+            stored, queried = projection.apply(vectors), projection.apply(query_vectors)
+        for dtype in (np.float32, np.float16):
+            # queries stay float32; only what is stored loses precision
+            ranked = _top_k(queried, stored.astype(dtype).astype(np.float32), k)
+            recall = np.mean([len(set(r) & set(ref)) / k for r, ref in zip(ranked, reference)]) if k else 0.0
+            size = dim * np.dtype(dtype).itemsize
+            rows.append((np.dtype(dtype).name, dim, size, recall))
+
+    full_size = rows[0][2]
+    print(f"{'dtype':<10}{'dim':>6}{'bytes/vec':>12}{'size':>8}{f'recall@{top_k}':>12}")
+    for dtype, dim, size, recall in rows:
+        print(f"{dtype:<10}{dim:>6}{size:>12}{size / full_size:>8.0%}{recall:>12.3f}")
+    return rows
+
+
+if __name__ == "__main__":
+    run_storage_report(sys.argv[1] if len(sys.argv) > 1 else "storage/repos/psf__requests")
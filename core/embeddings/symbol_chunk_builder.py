@@ -1,95 +1,55 @@
+import hashlib
 import os
-import ast
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from reposurfer.core.symbol_graph.parallel_parser import expand_symbols
+
+CHUNK_SYMBOL_TYPES = {"class", "method", "function"}
+
+
+def chunk_content_hash(text: str) -> str:
+    """
+    Hash of a chunk body: the header line (symbol id and file) is dropped and
+    whitespace collapsed, so vendored copies and re-indented duplicates collide.
+    """
+    body = text.split("\n", 1)[1] if "\n" in text else text
+    return hashlib.blake2b(" ".join(body.split()).encode("utf-8"), digest_size=16).hexdigest()
+
 
 class SymbolChunkBuilder:
+    """
+    Builds embedding chunks from the spans and docstrings recorded in symbols.jsonl.
+    Each source file is read once; nothing is parsed again.
+    """
+
     def __init__(self, repo_root: str):
         self.repo_root = repo_root
-        self._ast_cache = {}
-        self._source_cache = {}
 
-    def build_chunks(self, symbol_graph: dict):
-        chunks = []
+    def build_file_chunks(self, rel_path: str, symbols):
+        abs_path = os.path.join(self.repo_root, "source", rel_path)
+    
+        if not os.path.exists(abs_path):
+            return []
 
-        for node in symbol_graph.get("nodes", []):
-            if node["type"] not in {"class", "method", "function"}:
-                continue
+        with open(abs_path, "r", encoding="utf-8") as f:
+            source_lines = f.read().splitlines()
 
-            chunk = self._build_chunk(node)
+        chunks = []
+        for sym in symbols:
+            if sym["type"] not in CHUNK_SYMBOL_TYPES:
+                continue
+            chunk = self._make_chunk(sym, source_lines)
             if chunk:
                 chunks.append(chunk)
-
         return chunks
-
-    def _build_chunk(self, node: dict):
-        rel_path = node["file"]
-        abs_path = os.path.join(self.repo_root, "source", rel_path)
     
-        if not os.path.exists(abs_path):
-            return None
-    
-        tree, source_lines = self._parse_file(abs_path)
-    
-        # -------- CLASS SUPPORT --------
-        if node["type"] == "class":
-            for ast_node in ast.walk(tree):
-                if isinstance(ast_node, ast.ClassDef) and ast_node.name == node["id"]:
-                    return self._make_chunk(
-                        symbol_id=node["id"],
-                        symbol_type="class",
-                        ast_node=ast_node,
-                        source_lines=source_lines,
-                        rel_path=rel_path,
-                        metadata={}
-                    )
-    
-        # -------- FUNCTION SUPPORT --------
-        if node["type"] == "function":
-            for ast_node in ast.walk(tree):
-                if isinstance(ast_node, ast.FunctionDef) and ast_node.name == node["id"]:
-                    return self._make_chunk(
-                        symbol_id=node["id"],
-                        symbol_type="function",
-                        ast_node=ast_node,
-                        source_lines=source_lines,
-                        rel_path=rel_path,
-                        metadata={}
-                    )
-        # -------- METHOD SUPPORT --------
-        if node["type"] == "method":
-            if "." not in node["id"]:
-                return None
-    
-            class_name, method_name = node["id"].split(".", 1)
-    
-            for ast_node in ast.walk(tree):
-                if isinstance(ast_node, ast.ClassDef) and ast_node.name == class_name:
-                    for body_item in ast_node.body:
-                        if isinstance(body_item, ast.FunctionDef) and body_item.name == method_name:
-                            return self._make_chunk(
-                                symbol_id=node["id"],
-                                symbol_type="method",
-                                ast_node=body_item,
-                                source_lines=source_lines,
-                                rel_path=rel_path,
-                                metadata={
-                                    "parent_class": class_name
-                                }
-                            )
-    
-        
-            return None
-    
-    def _make_chunk(
-        self,
-        symbol_id: str,
-        symbol_type: str,
-        ast_node,
-        source_lines,
-        rel_path: str,
-        metadata: dict
-):    
-        docstring = ast.get_docstring(ast_node)
-        code_text = self._extract_node_text(ast_node, source_lines)
+    def _make_chunk(self, symbol: dict, source_lines):
+        symbol_id = symbol["symbol_id"]
+        symbol_type = symbol["type"]
+        rel_path = symbol["file"]
+        docstring = symbol.get("docstring")
+        code_text = self._extract_span_text(symbol, source_lines)
         if len(code_text.strip()) < 30:
             return None
 
@@ -101,31 +61,68 @@ class SymbolChunkBuilder:
             text_parts.append(f"Docstring:\n{docstring}")
     
         text_parts.append("Code:\n" + code_text)
+
+        metadata = {}
+        if symbol_type == "method" and symbol.get("parent"):
+            metadata["parent_class"] = symbol["parent"]
     
+        text = "\n\n".join(text_parts)
         return {
             "symbol_id": symbol_id,
             "symbol_type": symbol_type,
             "file": rel_path,
-            "text": "\n\n".join(text_parts),
+            "start_line": symbol["start_line"],
+            "end_line": symbol["end_line"],
+            "text": text,
+            "content_hash": chunk_content_hash(text),
             "metadata": metadata
         }
-    
 
+    def _extract_span_text(self, symbol: dict, source_lines):
+        start = symbol["start_line"] - 1
+        end = symbol["end_line"]
+        return "\n".join(source_lines[start:end])
 
-    def _parse_file(self, file_path: str):
-        if file_path in self._ast_cache:
-            return self._ast_cache[file_path], self._source_cache[file_path]
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            source = f.read()
+def _build_batch(repo_root: str, batch):
+    """Worker: chunks for a batch of (rel_path, imports, rows) symbols.jsonl records."""
+    builder = SymbolChunkBuilder(repo_root)
+    return [
+        builder.build_file_chunks(rel_path, expand_symbols(rel_path, imports, rows))
+        for rel_path, imports, rows in batch
+    ]
 
-        tree = ast.parse(source)
-        self._ast_cache[file_path] = tree
-        self._source_cache[file_path] = source.splitlines()
 
-        return tree, self._source_cache[file_path]
+def iter_file_chunks(repo_root: str, files, workers: int = 1, batch_size: int = 16):
+    """
+    Yield (rel_path, chunks) per (record, rows) from iter_symbol_files, in input order.
+    With workers > 1 batches of files are built on a process pool, with at most
+    workers * 2 batches in flight so memory stays bounded on any repo size.
+    """
+    if workers <= 1:
+        builder = SymbolChunkBuilder(repo_root)
+        for record, rows in files:
+            symbols = expand_symbols(record["path"], record["imports"], rows)
+            yield record["path"], builder.build_file_chunks(record["path"], symbols)
+        return
 
-    def _extract_node_text(self, ast_node, source_lines):
-        start = ast_node.lineno - 1
-        end = ast_node.end_lineno
-        return "\n".join(source_lines[start:end])
+    def batches():
+        batch = []
+        for record, rows in files:
+            batch.append((record["path"], record["imports"], rows))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches():
+            pending.append(([path for path, _, _ in batch], pool.submit(_build_batch, repo_root, batch)))
+            if len(pending) >= workers * 2:
+                paths, future = pending.popleft()
+                yield from zip(paths, future.result())
+        while pending:
+            paths, future = pending.popleft()
+            yield from zip(paths, future.result())
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+PROJECTION_FILE = "vector_projection.npz"
+
+
+class VectorProjection:
+    """
+    PCA projection fitted on a sample of a repo's embeddings, saved next to
+    its catalog. Stored vectors and query vectors both go through apply(),
+    which re-normalizes them so cosine scores stay comparable.
+    """
+
+    def __init__(self, mean, components):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+
+    @property
+    def dim(self) -> int:
+        return len(self.components)
+
+    @classmethod
+    def fit(cls, vectors, dim: int):
+        """Top `dim` principal components of `vectors`; needs at least `dim` of them."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) < dim:
+            raise ValueError(f"need at least {dim} vectors to fit a {dim}-dimensional projection, got {len(vectors)}")
+        mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        return cls(mean, vt[:dim])
+
+    def apply(self, vectors):
+        projected = (np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components.T
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        return projected / np.maximum(norms, 1e-12)
+
+    def save(self, repo_path: str):
+        path = os.path.join(repo_path, PROJECTION_FILE)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, mean=self.mean, components=self.components)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, repo_path: str):
+        """The repo's projection, or None when its vectors are stored at full dimension."""
+        path = os.path.join(repo_path, PROJECTION_FILE)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"])
+
+    @staticmethod
+    def remove(repo_path: str):
+        path = os.path.join(repo_path, PROJECTION_FILE)
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,27 +1,102 @@
+import hashlib
+from contextlib import contextmanager
+
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
+from qdrant_client.models import (
+    PointStruct, VectorParams, Distance, Datatype,
+    Filter, FieldCondition, MatchAny, FilterSelector, OptimizersConfigDiff,
+)
 from qdrant_client.http.models import CollectionStatus
 
+from reposurfer.config import QDRANT_URL, VECTOR_DTYPE, VECTOR_UPLOAD_WORKERS
+
+# Qdrant's own default, in KB of vectors per segment
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+
+def open_client(storage_path: str = "storage/qdrant", url: str = QDRANT_URL) -> QdrantClient:
+    """A Qdrant server client when REPOSURFER_QDRANT_URL is set, else local storage under `storage_path`."""
+    return QdrantClient(url=url) if url else QdrantClient(path=storage_path)
+
+
+def point_id(file: str, symbol_id: str) -> int:
+    """Stable point id for a symbol, so re-indexing a file overwrites its own vectors."""
+    digest = hashlib.blake2b(f"{file}::{symbol_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
 class VectorStore:
-    def __init__(self, collection_name: str, storage_path="storage/qdrant"):
+    def __init__(self, collection_name: str, storage_path="storage/qdrant", client: QdrantClient = None,
+                 dtype: str = VECTOR_DTYPE):
         self.collection = collection_name
-        self.client = QdrantClient(path=storage_path)
+        # float16 halves vector memory on a Qdrant server (REPOSURFER_QDRANT_URL); local storage keeps float32
+        self.datatype = Datatype.FLOAT16 if dtype == "float16" else None
+        # local storage allows one client per process; pass it in to share it between collections
+        self.client = client or open_client(storage_path)
 
     def create(self, vector_size: int):
         collections = self.client.get_collections().collections
         names = {c.name for c in collections}
 
         if self.collection in names:
+            # an interrupted bulk load leaves indexing off; updates must not build on that
+            config = self.client.get_collection(self.collection).config.optimizer_config
+            if not config.indexing_threshold:
+                self.client.update_collection(self.collection, optimizers_config=OptimizersConfigDiff(
+                    indexing_threshold=DEFAULT_INDEXING_THRESHOLD))
             return  # already exists
 
         self.client.create_collection(
             collection_name=self.collection,
             vectors_config=VectorParams(
                 size=vector_size,
-                distance=Distance.COSINE
+                distance=Distance.COSINE,
+                datatype=self.datatype
             )
         )
 
+    def reset(self, vector_size: int):
+        """Drop and recreate the collection for a full re-index."""
+        if self.client.collection_exists(self.collection):
+            self.client.delete_collection(self.collection)
+        self.create(vector_size)
+
+    @staticmethod
+    def _files_filter(files):
+        # "files" lists every file sharing a deduplicated vector; "file" is the pre-dedup payload
+        return Filter(should=[
+            FieldCondition(key="files", match=MatchAny(any=files)),
+            FieldCondition(key="file", match=MatchAny(any=files)),
+        ])
+
+    def delete_files(self, files):
+        """Delete every vector that belongs to any of `files`."""
+        files = list(files)
+        if not files:
+            return
+        self.client.delete(
+            collection_name=self.collection,
+            points_selector=FilterSelector(filter=self._files_filter(files))
+        )
+
+    def payloads_for_files(self, files, fields=None):
+        """Payloads (only `fields`, if given) of every vector that belongs to any of `files`."""
+        files = list(files)
+        payloads, offset = [], None
+        while files:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                scroll_filter=self._files_filter(files),
+                with_payload=fields if fields is not None else True,
+                with_vectors=False,
+                limit=1000,
+                offset=offset
+            )
+            payloads += [p.payload for p in points]
+            if offset is None:
+                break
+        return payloads
+
     def upsert(self, ids, vectors, payloads):
         points = [
             PointStruct(id=i, vector=v, payload=p)
@@ -32,8 +107,41 @@ class VectorStore:
             points=points
         )
 
-        count = self.client.count(self.collection, exact=True)
-        print(f"[VectorStore] Stored vectors: {count.count}")
+    def upload(self, ids, vectors, payloads, batch_size: int = 256, parallel: int = VECTOR_UPLOAD_WORKERS):
+        """
+        Bulk path for many points: the client batches them and, against a
+        Qdrant server, uploads from `parallel` processes.
+        """
+        self.client.upload_collection(
+            collection_name=self.collection,
+            vectors=np.asarray(vectors, dtype=np.float32),
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=True
+        )
+
+    def count(self) -> int:
+        return self.client.count(self.collection, exact=True).count
+
+    @contextmanager
+    def bulk_ingest(self):
+        """
+        Switch index building off (indexing_threshold=0) while the block
+        loads points and restore it afterwards, so the HNSW graph is built
+        once over the loaded collection. Vectors are counted once, at the end.
+        """
+        # 0 is what an interrupted bulk load leaves behind, never a setting to restore
+        threshold = self.client.get_collection(self.collection).config.optimizer_config.indexing_threshold
+        threshold = threshold or DEFAULT_INDEXING_THRESHOLD
+        self.client.update_collection(self.collection, optimizers_config=OptimizersConfigDiff(indexing_threshold=0))
+        try:
+            yield self
+        finally:
+            self.client.update_collection(self.collection,
+                                          optimizers_config=OptimizersConfigDiff(indexing_threshold=threshold))
+        print(f"[VectorStore] Stored vectors: {self.count()}")
 
     def search(self, vector, limit=10):
         result = self.client.query_points(
@@ -52,7 +160,8 @@ class VectorStore:
                 collection_name=self.collection,
                 vectors_config=VectorParams(
                     size=vector_size,
-                    distance=Distance.COSINE
+                    distance=Distance.COSINE,
+                    datatype=self.datatype
                 )
             )
    
\ No newline at end of file
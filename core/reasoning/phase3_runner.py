@@ -1,27 +1,24 @@
 import json
+from contextlib import nullcontext
 from pathlib import Path
 from reposurfer.core.retrieval.retriever import RepoRetriever
+from reposurfer.core.symbol_graph.graph_index import get_graph_index
 from reposurfer.core.embeddings.vector_store import VectorStore
 from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
 from reposurfer.core.reasoning.llm_client import LLMClient
 from reposurfer.core.reasoning.investigation import InvestigationPlanner
 from reposurfer.core.reasoning.conversation_memory import ConversationMemory
 from reposurfer.core.reasoning.repo_qa import RepoQA
+from reposurfer.core.server.client import ServerError
 
-def run_phase3(repo_path: str, query: str, mode: str = "investigate"):
+def load_phase3(repo_path: str, embedder: EmbeddingGenerator = None, store: VectorStore = None):
     """
-    Enhanced Phase 3 with multiple modes and memory support
-    
-    Args:
-        repo_path: Path to the repository
-        query: User's question or issue
-        mode: "investigate" for detailed analysis, "qa" for general questions
+    Everything Phase 3 needs for one repo. A long-running process (reposurfer
+    serve) passes its shared embedder and vector store and keeps the result,
+    so later questions skip the loading.
     """
-    print(repo_path)
-    
     # Load repository data
-    with open(f"{repo_path}/symbol_graph.json") as f:
-        symbol_graph = json.load(f)
+    graph_index = get_graph_index(repo_path)
     
     # Load repository metadata if available
     repo_metadata = {}
@@ -33,10 +30,24 @@ def run_phase3(repo_path: str, query: str, mode: str = "investigate"):
     repo_name = repo_path.split("/")[-1]
 
     # Initialize components
-    embedder = EmbeddingGenerator()
-    store = VectorStore(collection_name=repo_name)
-    retriever = RepoRetriever(store, symbol_graph, embedder)
-    llm = LLMClient()
+    embedder = embedder or EmbeddingGenerator()
+    store = store or VectorStore(collection_name=repo_name)
+    return {
+        "repo_name": repo_name,
+        "repo_metadata": repo_metadata,
+        "graph_index": graph_index,
+        "retriever": RepoRetriever(store, graph_index, embedder),
+    }
+
+
+def answer_phase3(repo_path: str, components: dict, query: str, mode: str = "investigate",
+                  memory_lock=nullcontext()):
+    """
+    Answer one question with loaded components; returns the text to show.
+    `memory_lock` guards the conversation memory file when answers run concurrently.
+    """
+    retriever = components["retriever"]
+    llm = components.get("llm") or LLMClient()
     memory = ConversationMemory(repo_path)
     
     # Determine if this is a general Q&A question or investigation
@@ -56,19 +67,21 @@ def run_phase3(repo_path: str, query: str, mode: str = "investigate"):
             print(f"📝 Top result: {retrieved[0].get('file', 'Unknown')} - {retrieved[0].get('id', 'Unknown')}")
         
         # Get basic repository context
+        repo_metadata = components["repo_metadata"]
         repo_context = {
-            'name': repo_metadata.get('name', repo_name),
+            'name': repo_metadata.get('name', components["repo_name"]),
             'description': repo_metadata.get('description', ''),
             'language': repo_metadata.get('language', 'Unknown'),
-            'file_count': len(symbol_graph.get('symbols', [])),
+            'file_count': components["graph_index"].graph.count('file'),
             'retrieved_symbols': retrieved  # Add retrieved symbols for context
         }
         
         answer = qa_system.answer_question(query, repo_context)
-        memory.add_exchange(query, answer, retrieved)
+        with memory_lock:
+            memory.load_memory()  # another answer may have been saved meanwhile
+            memory.add_exchange(query, answer, retrieved)
         
-        print(f"\n💬 Answer:\n{answer}")
-        return
+        return f"\n💬 Answer:\n{answer}"
     
     # Original investigation flow
     print("🔍 Retrieving relevant symbols...")
@@ -80,16 +93,43 @@ def run_phase3(repo_path: str, query: str, mode: str = "investigate"):
     plan = planner.generate_plan(query, retrieved)
     
     # Store in memory
-    memory.add_exchange(query, plan, retrieved)
-    
-    print(plan)
+    with memory_lock:
+        memory.load_memory()
+        memory.add_exchange(query, plan, retrieved)
     
     # Show conversation summary
     summary = memory.get_summary()
-    print(f"\n💾 {summary}")
+    return f"{plan}\n\n💾 {summary}"
+
+
+def run_phase3(repo_path: str, query: str, mode: str = "investigate"):
+    """
+    Enhanced Phase 3 with multiple modes and memory support
+    
+    Args:
+        repo_path: Path to the repository
+        query: User's question or issue
+        mode: "investigate" for detailed analysis, "qa" for general questions
+    """
+    print(repo_path)
+    components = load_phase3(repo_path)
+    print(answer_phase3(repo_path, components, query, mode))
+
+def run_interactive_mode(repo_path: str, client=None):
+    """
+    Interactive mode for follow-up questions. With a ServerClient every
+    question goes to the running `reposurfer serve`, which holds the vector
+    store open, instead of being answered in this process.
+    """
+    def ask(query, mode):
+        if client is None:
+            run_phase3(repo_path, query, mode=mode)
+            return
+        try:
+            print(client.chat(repo_path, query, mode=mode))
+        except ServerError as e:
+            print(f"❌ Server error: {e}")
 
-def run_interactive_mode(repo_path: str):
-    """Interactive mode for follow-up questions"""
     print(f"🚀 RepoSurfer Interactive Mode - {repo_path}")
     print("Type 'exit' to quit, 'clear' to clear memory, 'help' for commands")
     
@@ -115,9 +155,9 @@ Available commands:
                 continue
             elif query.lower().startswith('investigate'):
                 issue = query[11:].strip()
-                run_phase3(repo_path, issue, mode="investigate")
+                ask(issue, "investigate")
             else:
-                run_phase3(repo_path, query, mode="qa")
+                ask(query, "qa")
                 
         except KeyboardInterrupt:
             break
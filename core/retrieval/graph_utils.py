@@ -1,37 +1,21 @@
-def build_node_index(symbol_graph: dict):
-    return {node["id"]: node for node in symbol_graph.get("nodes",[])}
+from reposurfer.core.symbol_graph.graph_index import GraphIndex
 
-def build_adjacency(symbol_graph: dict):
-    adjacency = {}
+# share of the graph score that comes from global centrality rather than the walk
+CENTRALITY_WEIGHT = 0.1
 
-    for edge in symbol_graph.get("edges", []):
-        src = edge["source"]
-        dst = edge["target"]
 
-        adjacency.setdefault(src, set()).add(dst)
-        adjacency.setdefault(dst, set()).add(src)
-
-    return adjacency
-
-
-def get_neighbors(symbol_graph: dict, symbol_id: str):
-    adjacency = build_adjacency(symbol_graph)
-    return adjacency.get(symbol_id, set())
-
-
-def compute_graph_score(symbol_graph: dict, center_id: str, target_id: str):
+def compute_graph_scores(graph_index: GraphIndex, seed_scores: dict):
     """
-    Simple graph scoring:
-    - same node → 1.0
-    - direct neighbor → 0.6
-    - otherwise → 0.0
+    Graph scoring, seeded by the vector hits ({symbol_id: vector score}):
+    - personalized walk over the top-k neighbor lists, normalized to [0, 1]
+    - blended with the precomputed global centrality of each node
+    Returns {node id: score} for every node the walk reached.
     """
-    if center_id == target_id:
-        return 1.0
-
-    neighbors = get_neighbors(symbol_graph, center_id)
-    if target_id in neighbors:
-        return 0.6
-
-    return 0.0
-
+    seeds = {symbol_id: max(score, 0.0) + 1e-6 for symbol_id, score in seed_scores.items()}
+    walked = graph_index.walk(seeds)
+    peak = max(walked.values(), default=0.0) or 1.0
+
+    return {
+        node_id: (1 - CENTRALITY_WEIGHT) * score / peak + CENTRALITY_WEIGHT * graph_index.centrality(node_id)
+        for node_id, score in walked.items()
+    }
@@ -1,11 +1,10 @@
-import json
 from reposurfer.core.retrieval.retriever import RepoRetriever
+from reposurfer.core.symbol_graph.graph_index import get_graph_index
 from reposurfer.core.embeddings.vector_store import VectorStore
 from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
 
 def run_retrieval(repo_path: str, query: str):
-    with open(f"{repo_path}/symbol_graph.json") as f:
-        symbol_graph = json.load(f)
+    graph_index = get_graph_index(repo_path)
 
     repo_name = repo_path.split("/")[-1]
 
@@ -14,7 +13,7 @@ def run_retrieval(repo_path: str, query: str):
     store.create(vector_size=embedder.dim)
     retriever = RepoRetriever(
         vector_store=store,
-        symbol_graph=symbol_graph,
+        graph_index=graph_index,
         embedder=embedder
     )
 
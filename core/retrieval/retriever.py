@@ -1,50 +1,52 @@
 from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
-from reposurfer.core.retrieval.graph_utils import (
-    build_node_index,
-    get_neighbors,
-    compute_graph_score
-)
-import json
-from pathlib import Path
+from reposurfer.config import BASE_STORAGE_PATH
+from reposurfer.core.catalog.repo_catalog import RepoCatalog
+from reposurfer.core.embeddings.vector_projection import VectorProjection
+from reposurfer.core.retrieval.graph_utils import compute_graph_scores
+import os
 
 
 class RepoRetriever:
-    def __init__(self, vector_store, symbol_graph, embedder, alpha=0.7):
+    def __init__(self, vector_store, graph_index, embedder, alpha=0.7):
         self.vector_store = vector_store
-        self.symbol_graph = symbol_graph
+        self.graph_index = graph_index
         self.embedder = embedder
         self.alpha = alpha  # weight for vector_score
         self.beta = 1 - alpha  # weight for graph_score
-        self.node_index = build_node_index(symbol_graph)
         
-        # Load symbol chunks for text content
+        # Chunk text is looked up per result in the repo catalog
         self.repo_name = vector_store.collection
-        self.chunks_file = Path(f"storage/repos/{self.repo_name}/symbol_chunks.json")
-        self.symbol_chunks = {}
-        if self.chunks_file.exists():
-            with open(self.chunks_file, 'r') as f:
-                chunks = json.load(f)
-                for chunk in chunks:
-                    self.symbol_chunks[chunk['symbol_id']] = chunk
+        self.catalog = RepoCatalog(os.path.join(BASE_STORAGE_PATH, self.repo_name))
+        # stored vectors may be PCA-reduced; queries must go through the same projection
+        self.projection = VectorProjection.load(os.path.join(BASE_STORAGE_PATH, self.repo_name))
 
     def query(self, text: str, top_k: int = 5):
-        query_vector = self.embedder.embed([text])[0]
+        query_vector = self.embedder.embed([text], cache=False)[0]
+        if self.projection is not None:
+            query_vector = self.projection.apply(query_vector[None])[0]
         hits = self.vector_store.search(query_vector, limit=top_k)
     
+        # one walk seeded by all hits instead of a neighbor scan per hit
+        graph_scores = compute_graph_scores(
+            self.graph_index,
+            # reversed, so the best-scoring window of a symbol wins
+            {hit.payload["symbol_id"]: hit.score for hit in reversed(hits)}
+        )
+    
         expanded = {}
     
         for hit in hits:
             symbol_id = hit.payload["symbol_id"]
+            if symbol_id in expanded:
+                continue  # a lower-ranked window of a symbol already hit
     
             vector_score = hit.score
-            graph_score = compute_graph_score(
-                self.symbol_graph, symbol_id, symbol_id
-            )
+            graph_score = graph_scores.get(symbol_id, 0.0)
     
             final_score = self.alpha * vector_score + self.beta * graph_score
     
             # Get text content from symbol chunks
-            symbol_chunk = self.symbol_chunks.get(symbol_id, {})
+            symbol_chunk = self.catalog.chunk(symbol_id) or {}
             
             expanded[symbol_id] = {
                 "id": hit.payload["symbol_id"],
@@ -55,36 +57,42 @@ class RepoRetriever:
                 "end_line": symbol_chunk.get("end_line"),
                 "confidence": final_score,
                 "score": final_score,
-                "source": "vector"
+                "source": "vector",
+                # other symbols with the same body share this vector
+                "duplicates": [s["symbol_id"] for s in hit.payload.get("symbols", [])[1:]]
             }
 
     
-            # Graph expansion
-            neighbors = get_neighbors(self.symbol_graph, symbol_id)
-            for nid in neighbors:
-                if nid in self.node_index and nid not in expanded:
-                    g_score = compute_graph_score(
-                        self.symbol_graph, symbol_id, nid
-                    )
-                    
-                    # Get text content for neighbor
-                    neighbor_chunk = self.symbol_chunks.get(nid, {})
+        # Graph expansion: best-scored nodes the walk reached, at most top_k of them
+        added = 0
+        for nid, g_score in sorted(graph_scores.items(), key=lambda x: x[1], reverse=True):
+            if added >= top_k:
+                break
+            if nid in expanded:
+                continue
+            node = self.graph_index.node(nid)
+            if node is None:
+                continue
+            
+            # Get text content for neighbor
+            neighbor_chunk = self.catalog.chunk(nid) or {}
     
-                    expanded[nid] = {
-                        "id": nid,
-                        "type": self.node_index[nid]["type"],
-                        "file": self.node_index[nid]["file"],
-                        "text": neighbor_chunk.get("text", ""),
-                        "start_line": neighbor_chunk.get("start_line"),
-                        "end_line": neighbor_chunk.get("end_line"),
-                        "confidence": self.beta * g_score,
-                        "score": self.beta * g_score,
-                        "source": "graph"
-                    }
+            expanded[nid] = {
+                "id": nid,
+                "type": node["type"],
+                "file": node["file"],
+                "text": neighbor_chunk.get("text", ""),
+                "start_line": neighbor_chunk.get("start_line"),
+                "end_line": neighbor_chunk.get("end_line"),
+                "confidence": self.beta * g_score,
+                "score": self.beta * g_score,
+                "source": "graph"
+            }
+            added += 1
     
     
         return sorted(
             expanded.values(),
             key=lambda x: x["score"],
             reverse=True
-        )[:top_k]
\ No newline at end of file
+        )[:top_k]
@@ -0,0 +1,40 @@
+import json
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from reposurfer.config import SERVER_HOST, SERVER_PORT
+
+
+class ServerError(RuntimeError):
+    pass
+
+
+class ServerClient:
+    """
+    Talks to a running `reposurfer serve`. Only the standard library is
+    imported, so a client call costs no model or index loading.
+    """
+
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT):
+        self.url = f"http://{host}:{port}"
+
+    def _request(self, path: str, payload: dict = None, timeout: float = 600):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = Request(f"{self.url}{path}", data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as e:
+            raise ServerError(json.loads(e.read() or b"{}").get("error", str(e))) from e
+
+    def is_running(self) -> bool:
+        try:
+            return self._request("/health", timeout=1).get("status") == "ok"
+        except (URLError, OSError, ValueError, ServerError):
+            return False
+
+    def retrieve(self, repo_path: str, query: str, top_k: int = 5):
+        return self._request("/retrieve", {"repo_path": repo_path, "query": query, "top_k": top_k})["results"]
+
+    def chat(self, repo_path: str, query: str, mode: str = None) -> str:
+        return self._request("/chat", {"repo_path": repo_path, "query": query, "mode": mode})["output"]
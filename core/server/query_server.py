@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from reposurfer.config import SERVER_HOST, SERVER_PORT
+from reposurfer.core.embeddings.embedding_generator import EmbeddingGenerator
+from reposurfer.core.embeddings.vector_store import VectorStore, open_client
+from reposurfer.core.reasoning.llm_client import LLMClient
+from reposurfer.core.reasoning.phase3_runner import answer_phase3, load_phase3
+
+
+class _RepoState:
+    def __init__(self, components):
+        self.components = components
+        # the repo's catalog connection and memory file are not safe to share between threads;
+        # LLM calls, the slow part, still run concurrently
+        self.lock = threading.Lock()
+
+
+class QueryServer:
+    """
+    Holds the embedding model, the local vector store and every repo's
+    graph, catalog and retriever in memory, loading each repo on its first
+    request. Retrieval for one repo is serialized, and query embedding and
+    vector search, which every repo shares, are serialized across repos;
+    anything else, including LLM calls, runs concurrently.
+    """
+
+    def __init__(self, storage_path: str = "storage/qdrant"):
+        print("[Server] Loading embedding model and vector store...")
+        # the tokenizer, the model and the local Qdrant client are shared by all repos
+        # and none of them takes concurrent calls
+        self.model_lock = threading.Lock()
+        self.embedder = _Serialized(EmbeddingGenerator(), self.model_lock, {"embed"})
+        self.client = open_client(storage_path)
+        self._llm = None
+        self.repos = {}
+        self._lock = threading.Lock()
+
+    def llm(self):
+        # created on the first chat, so retrieval works without GROQ_API_KEY
+        with self._lock:
+            if self._llm is None:
+                self._llm = LLMClient()
+            return self._llm
+
+    def repo(self, repo_path: str) -> _RepoState:
+        repo_path = os.path.normpath(repo_path)
+        if not os.path.isdir(repo_path):
+            raise FileNotFoundError(f"repository {repo_path} not found")
+        with self._lock:
+            state = self.repos.get(repo_path)
+        if state is None:
+            print(f"[Server] Loading {repo_path}...")
+            store = _Serialized(VectorStore(collection_name=repo_path.split("/")[-1], client=self.client),
+                                self.model_lock, {"search"})
+            components = load_phase3(repo_path, self.embedder, store)
+            with self._lock:
+                state = self.repos.setdefault(repo_path, _RepoState(components))
+        return state
+
+    def retrieve(self, repo_path: str, query: str, top_k: int = 5):
+        state = self.repo(repo_path)
+        with state.lock:
+            return state.components["retriever"].query(query, top_k=top_k)
+
+    def chat(self, repo_path: str, query: str, mode: str = None):
+        state = self.repo(repo_path)
+        components = dict(state.components, llm=self.llm())
+        # RepoRetriever and the memory file go through the repo lock, the LLM does not
+        components["retriever"] = _LockedRetriever(components["retriever"], state.lock)
+        return answer_phase3(repo_path, components, query, mode, memory_lock=state.lock)
+
+    def status(self):
+        with self._lock:
+            return {"status": "ok", "repos": sorted(self.repos)}
+
+
+class _Serialized:
+    """Calls to `methods` of `target` hold `lock`; other attributes pass through."""
+
+    def __init__(self, target, lock, methods):
+        self.target = target
+        self.lock = lock
+        self.methods = methods
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if name not in self.methods:
+            return attr
+
+        def call(*args, **kwargs):
+            with self.lock:
+                return attr(*args, **kwargs)
+        return call
+
+
+class _LockedRetriever:
+    def __init__(self, retriever, lock):
+        self.retriever = retriever
+        self.lock = lock
+
+    def query(self, text: str, top_k: int = 5):
+        with self.lock:
+            return self.retriever.query(text, top_k=top_k)
+
+
+def _handler(server: QueryServer):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: dict):
+            data = json.dumps(body, default=float).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, server.status())
+            else:
+                self._reply(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path not in ("/retrieve", "/chat"):
+                self._reply(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                repo_path, query = request["repo_path"], request["query"]
+            except (KeyError, ValueError) as e:
+                self._reply(400, {"error": f"bad request: {e}"})
+                return
+
+            try:
+                if self.path == "/retrieve":
+                    self._reply(200, {"results": server.retrieve(repo_path, query, request.get("top_k", 5))})
+                else:
+                    self._reply(200, {"output": server.chat(repo_path, query, request.get("mode"))})
+            except FileNotFoundError as e:
+                self._reply(404, {"error": str(e)})
+            except Exception as e:
+                self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            print(f"[Server] {self.address_string()} {format % args}")
+
+    return Handler
+
+
+def run_server(host: str = SERVER_HOST, port: int = SERVER_PORT):
+    server = QueryServer()
+    httpd = ThreadingHTTPServer((host, port), _handler(server))
+    print(f"[Server] ✅ Listening on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        server.client.close()
+    print("\n[Server] 👋 Stopped")
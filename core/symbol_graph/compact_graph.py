@@ -0,0 +1,307 @@
+import os
+import shutil
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from reposurfer.core.clone.utils import load_json, save_json
+from reposurfer.core.symbol_graph.symbol_graph import GraphNode, GraphEdge
+
+GRAPH_DIR = "symbol_graph"
+GRAPH_FORMAT_VERSION = 1
+
+# placeholder type for edge endpoints that were never added as nodes (imported modules, external bases)
+EXTERNAL = "external"
+
+
+def _save_array(graph_dir: str, name: str, values):
+    np.save(os.path.join(graph_dir, f"{name}.npy"), values)
+
+
+def _load_array(graph_dir: str, name: str):
+    path = os.path.join(graph_dir, f"{name}.npy")
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)  # zero-length arrays cannot be mapped
+
+
+def _save_strings(graph_dir: str, name: str, strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    _save_array(graph_dir, f"{name}.offsets", offsets)
+    _save_array(graph_dir, f"{name}.blob", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+class _Strings:
+    """String table: one utf-8 blob plus offsets, both memory-mapped."""
+
+    def __init__(self, graph_dir: str, name: str):
+        self.offsets = _load_array(graph_dir, f"{name}.offsets")
+        self.blob = _load_array(graph_dir, f"{name}.blob")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+class CompactGraphBuilder:
+    """
+    Streams nodes and edges into the compact on-disk graph as they are added.
+    Names go straight to the string blob and edges are spilled to per-type
+    files in fixed-size batches; only the name -> id map and a byte per node
+    stay in memory. Drop-in for SymbolGraph in the graph_builder helpers.
+    """
+
+    EDGE_BATCH = 1 << 16
+
+    def __init__(self, graph_dir: str):
+        self.graph_dir = graph_dir
+        self.tmp_dir = f"{graph_dir}.tmp"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+
+        self.ids = {}
+        self.type_codes = {EXTERNAL: 0}
+        self.types = array("B")
+        self.file_codes = {"": 0}
+        self.files = array("i")
+        self.name_offsets = array("q", [0])
+        self.names_out = open(os.path.join(self.tmp_dir, "names.blob.raw"), "wb")
+        self.edges = {}  # edge type -> (spill file, pending [source, target, ...])
+        self.num_edges = 0
+
+    @property
+    def num_nodes(self):
+        return len(self.name_offsets) - 1
+
+    def _intern(self, name: str) -> int:
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.ids)
+            encoded = name.encode("utf-8")
+            self.names_out.write(encoded)
+            self.name_offsets.append(self.name_offsets[-1] + len(encoded))
+            self.types.append(0)
+            self.files.append(0)
+        return node_id
+
+    def has_node(self, name: str) -> bool:
+        node_id = self.ids.get(name)
+        return node_id is not None and self.types[node_id] != 0
+
+    def add_node(self, node: GraphNode):
+        node_id = self._intern(node.id)
+        self.types[node_id] = self.type_codes.setdefault(node.type, len(self.type_codes))
+        self.files[node_id] = self.file_codes.setdefault(node.file or "", len(self.file_codes))
+
+    def add_edge(self, edge: GraphEdge):
+        if edge.type not in self.edges:
+            spill = open(os.path.join(self.tmp_dir, f"{edge.type.lower()}.edges.raw"), "wb")
+            self.edges[edge.type] = (spill, array("i"))
+        spill, pending = self.edges[edge.type]
+        pending.append(self._intern(edge.source))
+        pending.append(self._intern(edge.target))
+        if len(pending) >= 2 * self.EDGE_BATCH:
+            pending.tofile(spill)
+            del pending[:]
+        self.num_edges += 1
+
+    def save(self, finalize=None):
+        """
+        Finish the arrays in the temp dir and swap it in, so readers that still
+        have the old files mapped keep a consistent view. `finalize(tmp_dir)`
+        can add derived arrays before the swap.
+        """
+        tmp_dir = self.tmp_dir
+        n = len(self.ids)
+
+        self.names_out.close()
+        _raw_to_npy(tmp_dir, "names.blob", np.uint8)
+        _save_array(tmp_dir, "names.offsets", np.frombuffer(self.name_offsets, dtype=np.int64))
+        _save_strings(tmp_dir, "files", list(self.file_codes))
+        _save_array(tmp_dir, "node_type", np.frombuffer(self.types, dtype=np.uint8))
+        _save_array(tmp_dir, "node_file", np.frombuffer(self.files, dtype=np.int32))
+        # node ids sorted by name, for binary-search lookups without a dict
+        _save_array(tmp_dir, "name_order", np.fromiter(
+            (self.ids[name] for name in sorted(self.ids)), dtype=np.int32, count=n))
+        self.ids = {}
+
+        edge_counts = {}
+        for edge_type, (spill, pending) in self.edges.items():
+            pending.tofile(spill)
+            spill.close()
+            raw_path = spill.name
+            pairs = np.fromfile(raw_path, dtype=np.int32).astype(np.int64)
+            os.remove(raw_path)
+            # sorted by (source, target) with duplicates dropped
+            keys = np.unique(pairs[0::2] * n + pairs[1::2])
+            del pairs
+            src, dst = keys // n, keys % n
+            _save_csr(tmp_dir, f"{edge_type.lower()}.out", src, dst, n)
+            order = np.lexsort((src, dst))
+            _save_csr(tmp_dir, f"{edge_type.lower()}.in", dst[order], src[order], n)
+            edge_counts[edge_type] = int(len(keys))
+
+        save_json(os.path.join(tmp_dir, "graph.json"), {
+            "version": GRAPH_FORMAT_VERSION,
+            "nodes": n,
+            "node_types": sorted(self.type_codes, key=self.type_codes.get),
+            "edge_types": edge_counts,
+        })
+
+        if finalize is not None:
+            finalize(tmp_dir)
+
+        graph_dir = self.graph_dir
+        old_dir = f"{graph_dir}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(graph_dir):
+            os.replace(graph_dir, old_dir)
+        os.replace(tmp_dir, graph_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return sum(edge_counts.values())
+
+
+def _raw_to_npy(graph_dir: str, name: str, dtype, chunk_size: int = 1 << 20):
+    """Wrap a raw dump in an .npy header by copying it in chunks, never holding it whole."""
+    raw_path = os.path.join(graph_dir, f"{name}.raw")
+    itemsize = np.dtype(dtype).itemsize
+    header = {"descr": np.dtype(dtype).str, "fortran_order": False,
+              "shape": (os.path.getsize(raw_path) // itemsize,)}
+    with open(raw_path, "rb") as src, open(os.path.join(graph_dir, f"{name}.npy"), "wb") as dst:
+        np.lib.format.write_array_header_1_0(dst, header)
+        shutil.copyfileobj(src, dst, chunk_size)
+    os.remove(raw_path)
+
+
+def _save_csr(graph_dir: str, name: str, rows, cols, n: int):
+    """rows must be sorted; offsets[i]:offsets[i+1] slices the cols of row i."""
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+    _save_array(graph_dir, f"{name}.offsets", offsets)
+    _save_array(graph_dir, f"{name}.targets", cols.astype(np.int32))
+
+
+class CompactGraph:
+    """
+    Read side of the compact graph. Every array is memory-mapped, so opening
+    is cheap regardless of repo size and processes share the page cache.
+    Nodes are addressed by int id; name <-> id goes through the string table.
+    """
+
+    def __init__(self, graph_dir: str):
+        meta = load_json(os.path.join(graph_dir, "graph.json"), None)
+        if meta is None:
+            raise FileNotFoundError(f"symbol graph not found in {graph_dir}, re-run indexing")
+        if meta["version"] != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"symbol graph format v{meta['version']} is not supported, re-run indexing")
+
+        self.graph_dir = graph_dir
+        self.node_types = meta["node_types"]
+        self.edge_types = list(meta["edge_types"])
+        self.edge_counts = meta["edge_types"]
+        self._names = _Strings(graph_dir, "names")
+        self._files = _Strings(graph_dir, "files")
+        self._node_type = _load_array(graph_dir, "node_type")
+        self._node_file = _load_array(graph_dir, "node_file")
+        self._name_order = _load_array(graph_dir, "name_order")
+        # derived at index time by graph_rankings, absent in graphs written without it
+        self.centrality = None
+        self._topk = None
+        if os.path.exists(os.path.join(graph_dir, "centrality.npy")):
+            self.centrality = _load_array(graph_dir, "centrality")
+            self._topk = (_load_array(graph_dir, "topk.offsets"),
+                          _load_array(graph_dir, "topk.targets"),
+                          _load_array(graph_dir, "topk.weights"))
+        self._out = {}
+        self._in = {}
+        for edge_type in self.edge_types:
+            prefix = edge_type.lower()
+            self._out[edge_type] = (_load_array(graph_dir, f"{prefix}.out.offsets"),
+                                    _load_array(graph_dir, f"{prefix}.out.targets"))
+            self._in[edge_type] = (_load_array(graph_dir, f"{prefix}.in.offsets"),
+                                   _load_array(graph_dir, f"{prefix}.in.targets"))
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def num_edges(self):
+        return sum(self.edge_counts.values())
+
+    # ---- nodes ----
+
+    def lookup(self, name: str):
+        """Int id of a node name, or None."""
+        order = self._name_order
+        i = bisect_left(range(len(order)), name, key=lambda k: self._names[order[k]])
+        if i < len(order) and self._names[order[i]] == name:
+            return int(order[i])
+        return None
+
+    def name(self, node_id: int) -> str:
+        return self._names[node_id]
+
+    def type_of(self, node_id: int) -> str:
+        return self.node_types[self._node_type[node_id]]
+
+    def file_of(self, node_id: int) -> str:
+        return self._files[self._node_file[node_id]]
+
+    def __contains__(self, name: str) -> bool:
+        node_id = self.lookup(name)
+        return node_id is not None and self.type_of(node_id) != EXTERNAL
+
+    def node(self, name: str):
+        """{"id", "type", "file"} like the old symbol_graph.json nodes, None for unknown/external."""
+        node_id = self.lookup(name)
+        if node_id is None or self.type_of(node_id) == EXTERNAL:
+            return None
+        return {"id": name, "type": self.type_of(node_id), "file": self.file_of(node_id)}
+
+    def count(self, node_type: str) -> int:
+        if node_type not in self.node_types:
+            return 0
+        return int(np.count_nonzero(self._node_type == self.node_types.index(node_type)))
+
+    # ---- edges ----
+
+    def successors(self, node_id: int, edge_type: str):
+        if edge_type not in self._out:
+            return ()
+        offsets, targets = self._out[edge_type]
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def predecessors(self, node_id: int, edge_type: str):
+        if edge_type not in self._in:
+            return ()
+        offsets, sources = self._in[edge_type]
+        return sources[offsets[node_id]:offsets[node_id + 1]]
+
+    def edge_arrays(self, edge_type: str):
+        """Forward CSR (offsets, targets) of one edge type."""
+        return self._out[edge_type]
+
+    def top_neighbors(self, node_id: int):
+        """(targets, transition probabilities) of the precomputed top-k neighbors of a node."""
+        if self._topk is None:
+            return (), ()
+        offsets, targets, weights = self._topk
+        start, end = offsets[node_id], offsets[node_id + 1]
+        return targets[start:end], weights[start:end]
+
+    def iter_edges(self, edge_types=None):
+        for edge_type in edge_types or self.edge_types:
+            offsets, targets = self._out[edge_type]
+            for source in np.flatnonzero(np.diff(offsets)):
+                for target in targets[offsets[source]:offsets[source + 1]]:
+                    yield {"type": edge_type, "source": self._names[source], "target": self._names[target]}
+
+
+def load_graph(repo_path: str) -> CompactGraph:
+    return CompactGraph(os.path.join(repo_path, GRAPH_DIR))
@@ -0,0 +1,177 @@
+import os
+from collections import deque
+from functools import lru_cache
+
+from reposurfer.config import GRAPH_WALK_BUDGET, GRAPH_WALK_DECAY, GRAPH_WALK_HOPS
+from reposurfer.core.symbol_graph.compact_graph import EXTERNAL, GRAPH_DIR, CompactGraph
+
+# query name -> (edge type, direction); "out" follows source -> target
+GRAPH_QUERIES = {
+    "callers": ("CALLS", "in"),
+    "callees": ("CALLS", "out"),
+    "subclasses": ("INHERITS", "in"),
+    "bases": ("INHERITS", "out"),
+    "members": ("CONTAINS", "out"),
+    "container": ("CONTAINS", "in"),
+    "imports": ("IMPORTS", "out"),
+    "importers": ("IMPORTS", "in"),
+}
+
+
+class GraphIndex:
+    """
+    Structural queries over a CompactGraph. Adjacency comes straight from the
+    per-edge-type forward/reverse CSR arrays; traversals are memoized, so
+    repeated expansion of the same node during retrieval is a dict hit.
+    """
+
+    def __init__(self, graph: CompactGraph, cache_size: int = 4096):
+        self.graph = graph
+        self._closure_ids = lru_cache(maxsize=cache_size)(self._closure_ids)
+        self._lookup = lru_cache(maxsize=cache_size)(graph.lookup)
+        has_centrality = graph.centrality is not None and len(graph.centrality)
+        self._centrality_peak = float(graph.centrality.max()) if has_centrality else 0.0
+
+    # ---- nodes ----
+
+    def node(self, name: str):
+        return self.graph.node(name)
+
+    def __contains__(self, name: str) -> bool:
+        return self.node(name) is not None
+
+    def resolve(self, name: str, limit: int = 20):
+        """Exact node name, else nodes whose id ends with `.name` (e.g. `send` -> `Session.send`)."""
+        if name in self:
+            return [name]
+        suffix = f".{name}"
+        matches = []
+        for node_id in range(len(self.graph)):
+            candidate = self.graph.name(node_id)
+            if candidate.endswith(suffix) and self.graph.type_of(node_id) != EXTERNAL:
+                matches.append(candidate)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    # ---- adjacency ----
+
+    def _step(self, node_id: int, edge_type: str, direction: str):
+        if direction == "out":
+            return self.graph.successors(node_id, edge_type)
+        return self.graph.predecessors(node_id, edge_type)
+
+    def related(self, name: str, edge_type: str, direction: str = "out"):
+        node_id = self._lookup(name)
+        if node_id is None:
+            return []
+        return [self.graph.name(int(other)) for other in self._step(node_id, edge_type, direction)]
+
+    def callers_of(self, name: str):
+        return self.related(name, "CALLS", "in")
+
+    def callees_of(self, name: str):
+        return self.related(name, "CALLS", "out")
+
+    def subclasses_of(self, name: str):
+        return self.related(name, "INHERITS", "in")
+
+    def bases_of(self, name: str):
+        return self.related(name, "INHERITS", "out")
+
+    def members_of(self, name: str):
+        return self.related(name, "CONTAINS", "out")
+
+    def contained_in(self, name: str):
+        return self.related(name, "CONTAINS", "in")
+
+    # ---- traversals ----
+
+    def _closure_ids(self, node_id: int, edge_type: str, direction: str, max_depth: int, limit: int):
+        depths = {}
+        queue = deque([(node_id, 0)])
+        seen = {node_id}
+        while queue and len(depths) < limit:
+            current, depth = queue.popleft()
+            if depth == max_depth:
+                continue
+            for other in self._step(current, edge_type, direction):
+                other = int(other)
+                if other not in seen:
+                    seen.add(other)
+                    depths[other] = depth + 1
+                    queue.append((other, depth + 1))
+        return tuple(depths.items())
+
+    def closure(self, name: str, edge_type: str, direction: str = "out",
+                max_depth: int = 3, limit: int = 1000):
+        """
+        Nodes reachable from `name` along one edge type, BFS up to `max_depth`
+        hops and at most `limit` nodes. Returns {name: depth}.
+        """
+        node_id = self._lookup(name)
+        if node_id is None:
+            return {}
+        return {self.graph.name(i): depth
+                for i, depth in self._closure_ids(node_id, edge_type, direction, max_depth, limit)}
+
+    def walk(self, seeds: dict, hops: int = GRAPH_WALK_HOPS, decay: float = GRAPH_WALK_DECAY,
+             budget: int = GRAPH_WALK_BUDGET):
+        """
+        Personalized PageRank truncated to `hops` steps over the precomputed
+        top-k neighbor lists, restarted at `seeds` ({name: weight}). Mass
+        decays by `decay` per hop and each hop keeps only the `budget`
+        heaviest nodes, so cost is bounded by hops x budget x k regardless of
+        hub degree. Returns {name: score}.
+        """
+        total = sum(seeds.values()) or 1.0
+        frontier = {}
+        for name, weight in seeds.items():
+            node_id = self._lookup(name)
+            if node_id is not None:
+                frontier[node_id] = frontier.get(node_id, 0.0) + weight / total
+
+        scores = {}
+        for hop in range(hops + 1):
+            for node_id, mass in frontier.items():
+                scores[node_id] = scores.get(node_id, 0.0) + mass
+            if hop == hops:
+                break
+            spread = {}
+            for node_id, mass in frontier.items():
+                targets, probabilities = self.graph.top_neighbors(node_id)
+                for other, p in zip(targets, probabilities):
+                    other = int(other)
+                    spread[other] = spread.get(other, 0.0) + mass * decay * float(p)
+            if len(spread) > budget:
+                spread = dict(sorted(spread.items(), key=lambda item: item[1], reverse=True)[:budget])
+            frontier = spread
+
+        return {self.graph.name(node_id): score for node_id, score in scores.items()}
+
+    def centrality(self, name: str) -> float:
+        """Precomputed global PageRank of a node, normalized to the graph maximum."""
+        node_id = self._lookup(name)
+        if node_id is None or not self._centrality_peak:
+            return 0.0
+        return float(self.graph.centrality[node_id]) / self._centrality_peak
+
+    def query(self, kind: str, name: str, max_depth: int = 1):
+        """One of GRAPH_QUERIES by name; depth > 1 walks it transitively. Returns {name: depth}."""
+        edge_type, direction = GRAPH_QUERIES[kind]
+        if max_depth <= 1:
+            return {other: 1 for other in self.related(name, edge_type, direction)}
+        return self.closure(name, edge_type, direction, max_depth)
+
+
+@lru_cache(maxsize=8)
+def _cached_index(graph_dir: str, mtime: float) -> GraphIndex:
+    return GraphIndex(CompactGraph(graph_dir))
+
+
+def get_graph_index(repo_path: str) -> GraphIndex:
+    """GraphIndex for a repo, built once per process and rebuilt when the graph is rewritten."""
+    graph_dir = os.path.join(repo_path, GRAPH_DIR)
+    meta_path = os.path.join(graph_dir, "graph.json")
+    mtime = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0.0
+    return _cached_index(graph_dir, mtime)
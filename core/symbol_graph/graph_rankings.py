@@ -0,0 +1,87 @@
+import numpy as np
+
+from reposurfer.config import GRAPH_TOPK_NEIGHBORS
+from reposurfer.core.symbol_graph.compact_graph import CompactGraph, _save_array
+
+# how strongly each relation ties two symbols together (both directions)
+EDGE_WEIGHTS = {
+    "CALLS": 1.0,
+    "INHERITS": 0.8,
+    "CONTAINS": 0.6,
+    "IMPORTS": 0.2,
+}
+
+
+def weighted_edges(graph: CompactGraph):
+    """Undirected (src, dst, weight) arrays over every edge type, parallel edges summed."""
+    n = len(graph)
+    sources, targets, weights = [], [], []
+    for edge_type in graph.edge_types:
+        offsets, dst = graph.edge_arrays(edge_type)
+        src = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        w = np.full(len(src), EDGE_WEIGHTS.get(edge_type, 0.5))
+        sources += [src, dst.astype(np.int64)]
+        targets += [dst.astype(np.int64), src]
+        weights += [w, w]
+    if not sources:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0)
+
+    keys, inverse = np.unique(np.concatenate(sources) * n + np.concatenate(targets), return_inverse=True)
+    summed = np.bincount(inverse, weights=np.concatenate(weights))
+    src, dst = keys // n, keys % n
+    keep = src != dst
+    return src[keep], dst[keep], summed[keep]
+
+
+def pagerank(n: int, src, dst, weights, damping: float = 0.85, iterations: int = 50, tol: float = 1e-6):
+    """Weighted PageRank by power iteration; dangling mass is spread uniformly."""
+    if n == 0:
+        return np.zeros(0, np.float32)
+    out_weight = np.bincount(src, weights=weights, minlength=n)
+    dangling = out_weight == 0
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        share = np.divide(rank, out_weight, out=np.zeros(n), where=~dangling)
+        spread = np.bincount(dst, weights=share[src] * weights, minlength=n)
+        updated = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+        delta = np.abs(updated - rank).sum()
+        rank = updated
+        if delta < tol:
+            break
+    return rank.astype(np.float32)
+
+
+def top_neighbors(n: int, src, dst, weights, centrality, k: int):
+    """
+    Keep the k neighbors of every node with the highest weight x centrality,
+    as CSR (offsets, targets, transition probabilities over the kept edges).
+    """
+    score = weights * centrality[dst]
+    order = np.lexsort((-score, src))
+    src, dst, weights = src[order], dst[order], weights[order]
+
+    starts = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=starts[1:])
+    rank_in_row = np.arange(len(src)) - starts[src]
+    keep = rank_in_row < k
+    src, dst, weights = src[keep], dst[keep], weights[keep]
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    row_total = np.bincount(src, weights=weights, minlength=n)
+    probabilities = weights / row_total[src] if len(src) else weights
+    return offsets, dst.astype(np.int32), probabilities.astype(np.float32)
+
+
+def precompute_rankings(graph_dir: str, top_k: int = GRAPH_TOPK_NEIGHBORS):
+    """Global centrality and capped neighbor lists, stored next to the graph arrays."""
+    graph = CompactGraph(graph_dir)
+    n = len(graph)
+    src, dst, weights = weighted_edges(graph)
+    centrality = pagerank(n, src, dst, weights)
+    offsets, targets, probabilities = top_neighbors(n, src, dst, weights, centrality, top_k)
+
+    _save_array(graph_dir, "centrality", centrality)
+    _save_array(graph_dir, "topk.offsets", offsets)
+    _save_array(graph_dir, "topk.targets", targets)
+    _save_array(graph_dir, "topk.weights", probabilities)
@@ -1,3 +1,13 @@
+import os
+
+from reposurfer.core.clone.tree_builder import EXTENSION_LANGUAGE_MAP
+
+
 def is_python_file(file_entry: dict) -> bool:
     """Decide whether a tree.json entry represents a python source file."""
-    return file_entry.get("path","").endswith(".py")
\ No newline at end of file
+    return file_entry.get("path","").endswith(".py")
+
+
+def detect_language(path: str):
+    """Language name for a file path from its extension, None if unknown."""
+    return EXTENSION_LANGUAGE_MAP.get(os.path.splitext(path)[1].lower())
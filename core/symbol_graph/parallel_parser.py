@@ -0,0 +1,151 @@
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from reposurfer.core.symbol_graph.parser_registry import ParserRegistry
+from reposurfer.core.symbol_graph.symbols import SYMBOL_FIELDS
+
+
+
+class ParseTimeout(BaseException):
+    """Not an Exception, so a parser's own error handling cannot swallow it."""
+
+
+def extract_file_symbols(source_root: str, rel_path: str, registry: ParserRegistry):
+    """
+    Read, parse and visit one file with the parser for its language.
+    Returns (status, imports, symbols) where status is
+    success | unsupported | not found | read error | parse error.
+    Timeouts, MemoryError and RecursionError propagate to the caller.
+    """
+    file_path = os.path.join(source_root, rel_path)
+
+    parser = registry.for_path(rel_path)
+    if parser is None:
+        return "unsupported", [], []
+
+    if not os.path.exists(file_path):
+        return "not found", [], []
+
+    try:
+        with open(file_path, "r", encoding = "utf-8") as f:
+            content = f.read()
+    except OSError:
+        return "read error", [], []
+
+    extracted = parser.extract(rel_path, content)
+    if extracted is None:
+        return "parse error", [], []
+    imports, symbols = extracted
+    return "success", imports, symbols
+
+
+def expand_symbols(rel_path: str, imports, rows):
+    """Compact rows -> symbol dicts (all symbols of a file share one imports list)."""
+    symbols = []
+    for row in rows:
+        symbol = dict(zip(SYMBOL_FIELDS, row))
+        symbol["file"] = rel_path
+        symbol["imports"] = imports
+        symbols.append(symbol)
+    return symbols
+
+
+def _raise_timeout(signum, frame):
+    raise ParseTimeout()
+
+
+def _init_worker(memory_limit_mb: int):
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # no address-space limit on this platform
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _parse_shard(source_root: str, paths, timeout: float):
+    """Worker: parse a shard of files, one (path, status, imports, rows) per file."""
+    registry = ParserRegistry()
+    results = []
+    for rel_path in paths:
+        if timeout and hasattr(signal, "SIGALRM"):
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            status, imports, symbols = extract_file_symbols(source_root, rel_path, registry)
+            rows = [tuple(s[f] for f in SYMBOL_FIELDS) for s in symbols]
+        except ParseTimeout:
+            status, imports, rows = "timeout", [], []
+        except (MemoryError, RecursionError):
+            status, imports, rows = "memory error", [], []
+        finally:
+            if timeout and hasattr(signal, "SIGALRM"):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        results.append((rel_path, status, imports, rows))
+    return results
+
+
+def _kill_workers(pool: ProcessPoolExecutor):
+    # breaks the pool: every unfinished shard fails with BrokenProcessPool and is retried
+    for process in list(pool._processes.values()):
+        process.kill()
+
+
+def parse_files_parallel(source_root: str, paths, workers: int, timeout: float,
+                         memory_limit_mb: int, shard_size: int = 32, pbar=None):
+    """
+    Parse `paths` on a process pool and return (path, status, imports, rows) in input order.
+    A shard whose worker dies is retried file by file in a fresh pool, so one
+    pathological file only fails itself. SIGALRM cannot interrupt C code
+    (ast.parse, tree-sitter), so a shard running past its deadline has its
+    worker killed the same way.
+    """
+    shards = [paths[i:i + shard_size] for i in range(0, len(paths), shard_size)]
+    pending = [((i,), shard) for i, shard in enumerate(shards)]
+    results = {}
+
+    while pending:
+        retry = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(memory_limit_mb,)) as pool:
+            futures = {
+                pool.submit(_parse_shard, source_root, shard, timeout): (key, shard)
+                for key, shard in pending
+            }
+            started, timed_out = {}, set()
+            not_done = set(futures)
+            while not_done:
+                done, not_done = wait(not_done, timeout=1.0 if timeout else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, shard = futures[future]
+                    try:
+                        results[key] = future.result()
+                    except BrokenProcessPool:
+                        if len(shard) == 1:
+                            status = "timeout" if future in timed_out else "worker crashed"
+                            results[key] = [(shard[0], status, [], [])]
+                        else:
+                            retry.extend(((*key, i), [p]) for i, p in enumerate(shard))
+                            continue
+                    if pbar is not None:
+                        pbar.update(len(shard))
+
+                if timeout and not_done:
+                    now = time.monotonic()
+                    for future in not_done:
+                        if future.running():
+                            started.setdefault(future, now)
+                    # a shard counts as running while it waits in the call queue, hence twice its budget
+                    stuck = {f for f in started if f in not_done
+                             and now - started[f] > 2 * timeout * len(futures[f][1])}
+                    if stuck:
+                        timed_out |= stuck
+                        _kill_workers(pool)
+        pending = retry
+
+    return [item for key in sorted(results) for item in results[key]]
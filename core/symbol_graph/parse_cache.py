@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+
+from reposurfer.config import CACHE_STORAGE_PATH
+from reposurfer.core.symbol_graph.symbols import SYMBOL_FIELDS
+from reposurfer.core.symbol_graph.python_symbol_extractor import EXTRACTOR_VERSION
+from reposurfer.core.symbol_graph.treesitter_parser import TREESITTER_EXTRACTOR_VERSION
+
+# results worth keeping: "parse error" is a SyntaxError/ValueError, which only the
+# content decides; timeouts, memory errors and crashes may not happen again
+CACHEABLE_STATUSES = {"success", "parse error"}
+# bumped when the meaning of a cached status changes (2: timeouts no longer stored as parse errors)
+PARSE_CACHE_FORMAT = 2
+
+
+class ParseCache:
+    """
+    Extracted imports and symbol rows per file, keyed by the tree.json content hash.
+    Rows carry no file path, so identical files in other repos or forks share entries.
+    """
+
+    def __init__(self, cache_dir=os.path.join(CACHE_STORAGE_PATH, "parse")):
+        version = f"f{PARSE_CACHE_FORMAT}-v{EXTRACTOR_VERSION}.{TREESITTER_EXTRACTOR_VERSION}-{len(SYMBOL_FIELDS)}"
+        self.cache_dir = os.path.join(cache_dir, version)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}.json")
+
+    def get(self, content_hash: str):
+        """Returns (status, imports, rows) or None."""
+        if content_hash:
+            path = self._path(content_hash)
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    self.hits += 1
+                    return data["status"], data["imports"], [tuple(r) for r in data["rows"]]
+                except (OSError, ValueError, KeyError):
+                    pass
+        self.misses += 1
+        return None
+
+    def put(self, content_hash: str, status: str, imports, rows):
+        if not content_hash or status not in CACHEABLE_STATUSES:
+            return
+        path = self._path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"status": status, "imports": imports, "rows": rows}, f)
+        os.replace(tmp_path, path)
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({ratio:.0%} hit rate)"
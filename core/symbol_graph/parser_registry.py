@@ -0,0 +1,43 @@
+
+from reposurfer.core.symbol_graph.language_detector import detect_language
+from reposurfer.core.symbol_graph.python_parser import PythonASTParser
+from reposurfer.core.symbol_graph.treesitter_parser import GRAMMAR_MODULES, TreeSitterParser
+
+
+class ParserRegistry:
+    """
+    Picks the parser for a file: PythonASTParser for .py, a tree-sitter grammar
+    for the other languages. Parsers are created on first use; a grammar whose
+    package is not installed is reported once and its files are skipped.
+    """
+
+    def __init__(self):
+        self.parsers = {"python": PythonASTParser()}
+        self.missing = set()
+
+    @staticmethod
+    def grammar_for(rel_path: str):
+        if rel_path.lower().endswith(".tsx"):
+            return "tsx"
+        language = detect_language(rel_path)
+        if language == "python" or language in GRAMMAR_MODULES:
+            return language
+        return None
+
+    def _parser(self, grammar: str):
+        if grammar not in self.parsers and grammar not in self.missing:
+            try:
+                self.parsers[grammar] = TreeSitterParser(grammar)
+            except ImportError as e:
+                print(f"[Phase1] ⚠️ No tree-sitter grammar for {grammar} ({e}), skipping those files")
+                self.missing.add(grammar)
+        return self.parsers.get(grammar)
+
+    def supports(self, rel_path: str) -> bool:
+        grammar = self.grammar_for(rel_path)
+        return grammar is not None and self._parser(grammar) is not None
+
+    def for_path(self, rel_path: str):
+        """Parser with an extract(file_path, content) method, or None."""
+        grammar = self.grammar_for(rel_path)
+        return self._parser(grammar) if grammar else None
@@ -1,33 +1,29 @@
 import os
-import json
 from tqdm import tqdm
 
-from reposurfer.core.symbol_graph.symbol_loader import load_symbols
+from reposurfer.core.symbol_graph.symbol_loader import SYMBOLS_FILE, iter_symbols, iter_symbol_files
 from reposurfer.core.symbol_graph.graph_builder import (
-    SymbolGraph,
     GraphNode,
     GraphEdge,
-    add_import_edges,
     add_inherits_edges,
+    add_call_edges,
 )
-
-from reposurfer.core.clone.utils import save_json
+from reposurfer.core.catalog.repo_catalog import RepoCatalog
+from reposurfer.core.symbol_graph.compact_graph import GRAPH_DIR, CompactGraphBuilder, load_graph
+from reposurfer.core.symbol_graph.graph_rankings import precompute_rankings
 
 
 def run_phase1_7(repo_path: str):
     print(f"[Phase1.7] Building symbol graph...")
     
-    symbols_path = os.path.join(repo_path, "symbols.json")
-    output_path = os.path.join(repo_path, "symbol_graph.json")
-
-    symbols = load_symbols(symbols_path)
-    print(f"[Phase1.7] Processing {len(symbols)} symbols...")
+    symbols_path = os.path.join(repo_path, SYMBOLS_FILE)
+    output_path = os.path.join(repo_path, GRAPH_DIR)
 
-    # Initialize graph once
-    graph = SymbolGraph()
+    # Initialize graph once; nodes and edges are streamed to disk as they are added
+    graph = CompactGraphBuilder(output_path)
     
     # Progress bar for adding nodes
-    with tqdm(symbols, desc="Adding symbol nodes", unit="symbol") as pbar:
+    with tqdm(iter_symbols(symbols_path), desc="Adding symbol nodes", unit="symbol") as pbar:
         for sym in pbar:
             symbol_id = sym["symbol_id"]
             symbol_type = sym["type"]
@@ -43,7 +39,7 @@ def run_phase1_7(repo_path: str):
             )
 
             # Add file node if not already added
-            if file_path not in graph.nodes:
+            if not graph.has_node(file_path):
                 graph.add_node(
                     GraphNode(
                         id=file_path,
@@ -70,29 +66,39 @@ def run_phase1_7(repo_path: str):
                     )
                 )
             
-            pbar.set_postfix({"nodes": len(graph.nodes), "edges": len(graph.edges)})
+            pbar.set_postfix({"nodes": graph.num_nodes, "edges": graph.num_edges})
 
-    # Add import edges
+    # Add import edges (imports are stored once per file record)
     print(f"[Phase1.7] Adding import relationships...")
-    with tqdm(symbols, desc="Adding import edges", unit="symbol") as pbar:
-        for sym in pbar:
-            if sym.get("imports"):
-                for imp in sym["imports"]:
-                    graph.add_edge(
-                        GraphEdge(
-                            type="IMPORTS",
-                            source=symbol_id,
-                            target=imp,
-                        )
+    with tqdm(iter_symbol_files(symbols_path), desc="Adding import edges", unit="file") as pbar:
+        for record, _ in pbar:
+            for imp in dict.fromkeys(record["imports"]):
+                graph.add_edge(
+                    GraphEdge(
+                        type="IMPORTS",
+                        source=record["path"],
+                        target=imp,
                     )
-                pbar.set_postfix({"imports": len(sym.get("imports", []))})
+                )
+            pbar.set_postfix({"imports": len(record["imports"])})
 
     # Add inheritance edges
     print(f"[Phase1.7] Adding inheritance relationships...")
-    add_inherits_edges(graph, symbols)
+    add_inherits_edges(graph, iter_symbols(symbols_path))
+
+    # Add call edges, keeping only call sites that resolved to a known symbol
+    print(f"[Phase1.7] Adding call relationships...")
+    for sym in iter_symbols(symbols_path):
+        callees = [c for c in sym.get("calls", []) if graph.has_node(c) and c != sym["symbol_id"]]
+        if callees:
+            add_call_edges(graph, {sym["symbol_id"]: dict.fromkeys(callees)})
+
+    # centrality and capped neighbor lists for retrieval scoring
+    num_edges = graph.save(finalize=precompute_rankings)
+    with RepoCatalog(repo_path) as catalog, catalog.transaction():
+        catalog.replace_edges(load_graph(repo_path).iter_edges())
 
-    save_json(output_path, graph.to_dict())
-    print(f"[Phase1.7] ✅ Symbol graph created: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
+    print(f"[Phase1.7] ✅ Symbol graph created: {graph.num_nodes} nodes, {num_edges} edges")
 
 
 if __name__ == "__main__":
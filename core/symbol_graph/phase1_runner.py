@@ -1,15 +1,73 @@
 # this is a temporary file to test
 import os
 import json
+from collections import Counter
 from tqdm import tqdm
 
-from reposurfer.core.clone.utils import save_json
-from reposurfer.core.symbol_graph.language_detector import is_python_file
-from reposurfer.core.symbol_graph.python_parser import PythonASTParser
-from reposurfer.core.symbol_graph.python_symbol_extractor import PythonSymbolExtractor
+from reposurfer.config import PARSE_WORKERS, PARSE_TIMEOUT_SECONDS, PARSE_MEMORY_LIMIT_MB
+from reposurfer.core.catalog.repo_catalog import RepoCatalog
+from reposurfer.core.symbol_graph.parser_registry import ParserRegistry
+from reposurfer.core.symbol_graph.parallel_parser import (
+    extract_file_symbols,
+    parse_files_parallel,
+)
+from reposurfer.core.symbol_graph.parse_cache import ParseCache
+from reposurfer.core.symbol_graph.symbol_loader import SYMBOLS_FILE, SymbolWriter, iter_symbol_files
+from reposurfer.core.symbol_graph.symbols import SYMBOL_FIELDS
 
 
-def run_phase1(repo_path:str):
+def _parse_serial(source_root: str, paths, registry: ParserRegistry, pbar):
+    for rel_path in paths:
+        try:
+            status, imports, symbols = extract_file_symbols(source_root, rel_path, registry)
+        except (MemoryError, RecursionError):
+            status, imports, symbols = "memory error", [], []
+        pbar.update(1)
+        yield rel_path, status, imports, [tuple(s[f] for f in SYMBOL_FIELDS) for s in symbols]
+
+
+def _parse_entries(source_root: str, entries, workers: int, cache: ParseCache,
+                   registry: ParserRegistry, pbar):
+    """
+    Serve files from the parse cache by content hash and parse only the misses.
+    Yields (path, status, imports, rows) in `entries` order.
+    """
+    cached = {}
+    misses = []
+    for entry in entries:
+        hit = cache.get(entry.get("hash"))
+        if hit is None:
+            misses.append(entry["path"])
+        else:
+            cached[entry["path"]] = hit
+            pbar.update(1)
+
+    if workers > 1 and len(misses) > 1:
+        parsed = parse_files_parallel(
+            source_root, misses, workers,
+            timeout=PARSE_TIMEOUT_SECONDS,
+            memory_limit_mb=PARSE_MEMORY_LIMIT_MB,
+            pbar=pbar,
+        )
+    else:
+        parsed = _parse_serial(source_root, misses, registry, pbar)
+
+    hashes = {entry["path"]: entry.get("hash") for entry in entries}
+    for rel_path, status, imports, rows in parsed:
+        cache.put(hashes[rel_path], status, imports, rows)
+        cached[rel_path] = (status, imports, rows)
+
+    for entry in entries:
+        yield (entry["path"], *cached[entry["path"]])
+
+
+def run_phase1(repo_path:str, workers: int = PARSE_WORKERS):
+    """
+    workers > 1 shards the files across a process pool (with per-file timeout
+    and per-worker memory cap); results are merged in tree.json order either way.
+    Files whose content hash is in the parse cache are not parsed at all.
+    Python goes through the ast module, the other languages through tree-sitter.
+    """
     tree_file  = os.path.join(repo_path,"tree.json")
     source_root = os.path.join(repo_path,"source")
 
@@ -19,56 +77,77 @@ def run_phase1(repo_path:str):
     with open(tree_file,"r") as f:
         tree = json.load(f)
     
-    # Filter Python files
-    python_files = [entry for entry in tree if is_python_file(entry)]
-    print(f"[Phase1] Found {len(python_files)} Python files to analyze")
+    # Filter files we have a parser for
+    registry = ParserRegistry()
+    source_files = [entry for entry in tree if registry.supports(entry["path"])]
+    languages = Counter(registry.grammar_for(entry["path"]) for entry in source_files)
+    print(f"[Phase1] Found {len(source_files)} source files to analyze "
+          f"({', '.join(f'{lang}: {n}' for lang, n in languages.most_common())})")
     
-    parser = PythonASTParser()
     parsed_count = 0
     failed_count = 0
-    all_symbols = []
+    hashes = {entry["path"]: entry.get("hash") for entry in source_files}
+    cache = ParseCache()
     
-    # Progress bar for file processing
-    with tqdm(python_files, desc="Parsing Python files", unit="file") as pbar:
-        for entry in pbar:
-            file_path = os.path.join(source_root, entry["path"])
-
-            if not os.path.exists(file_path):
-                pbar.set_postfix({"status": "not found"})
-                continue
-
-            try:
-                with open(file_path, "r", encoding = "utf-8") as f:
-                    content = f.read()
-            except Exception as e:
-                pbar.set_postfix({"status": "read error"})
-                failed_count+=1
+    # Progress bar for file processing; symbols go to symbols.jsonl and the catalog in one pass
+    with SymbolWriter(os.path.join(repo_path, SYMBOLS_FILE)) as writer, \
+            RepoCatalog(repo_path) as catalog, catalog.transaction(), \
+            tqdm(total=len(source_files), desc="Parsing source files", unit="file") as pbar:
+        catalog.clear()
+        for rel_path, status, imports, rows in _parse_entries(source_root, source_files, workers,
+                                                              cache, registry, pbar):
+            if status == "not found":
                 continue
-
-            ast_tree = parser.parse(entry["path"], content)
-            if ast_tree is None:
-                pbar.set_postfix({"status": "parse error"})
+            if status != "success":
+                print(f"[Phase1] {status}: {rel_path}")
                 failed_count+=1
                 continue
-            
-            extractor = PythonSymbolExtractor(entry["path"])
-            extractor.visit(ast_tree)
-            
-            for s in extractor.symbols:
-                s["imports"] = extractor.imports
-                all_symbols.append(s)
 
+            writer.write_file(rel_path, imports, rows, hashes[rel_path])
+            catalog.write_file(rel_path, imports, rows, hashes[rel_path])
             parsed_count+=1
-            pbar.set_postfix({"status": "success", "symbols": len(all_symbols)})
-    
-    save_json(os.path.join(repo_path, "symbols.json"), all_symbols)
 
     print(f"[Phase1] ✅ Parsed files: {parsed_count}")
     print(f"[Phase1] ❌ Failed files: {failed_count}")
-    print(f"[Phase1] 📊 Total symbols extracted: {len(all_symbols)}")
+    print(f"[Phase1] 📊 Total symbols extracted: {writer.symbols}")
+    print(f"[Phase1] 💾 Parse cache: {cache.report()}")
+
+
+def update_phase1(repo_path: str, changed_paths, deleted_paths):
+    """
+    Incremental Phase 1: drop the symbols of changed/deleted files and
+    re-extract only the changed source files.
+    """
+    source_root = os.path.join(repo_path, "source")
+    symbols_path = os.path.join(repo_path, SYMBOLS_FILE)
+
+    changed = set(changed_paths)
+    touched = changed | set(deleted_paths)
+
+    registry = ParserRegistry()
+    with open(os.path.join(repo_path, "tree.json"), "r") as f:
+        entries = [e for e in json.load(f) if e["path"] in changed and registry.supports(e["path"])]
+
+    reparsed = 0
+    cache = ParseCache()
+    with SymbolWriter(symbols_path) as writer, RepoCatalog(repo_path) as catalog, catalog.transaction():
+        catalog.delete_files(touched)
+        for record, rows in iter_symbol_files(symbols_path):
+            if record["path"] not in touched:
+                writer.write_file(record["path"], record["imports"], rows, record.get("hash"))
+
+        with tqdm(total=len(entries), desc="Parsing changed files", unit="file") as pbar:
+            for entry, (rel_path, status, imports, rows) in zip(
+                    entries, _parse_entries(source_root, entries, PARSE_WORKERS, cache, registry, pbar)):
+                if status == "success":
+                    writer.write_file(rel_path, imports, rows, entry.get("hash"))
+                    catalog.write_file(rel_path, imports, rows, entry.get("hash"))
+                    reparsed += 1
+
+    print(f"[Phase1] 🔁 Re-parsed {reparsed} files, {writer.symbols} symbols total")
 
 
 if __name__ == "__main__":
 
     REPO_PATH = "storage/repos/psf__requests"
-    run_phase1(REPO_PATH)
\ No newline at end of file
+    run_phase1(REPO_PATH)
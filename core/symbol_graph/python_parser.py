@@ -1,5 +1,7 @@
 import ast
 
+from reposurfer.core.symbol_graph.python_symbol_extractor import PythonSymbolExtractor
+
 class PythonASTParser:
     def parse(self, file_path: str,content: str):
         """Parse python source code into an AST.
@@ -9,6 +11,15 @@ class PythonASTParser:
         except SyntaxError as e:
             print(f"[Phase1][AST] SynataxError in {file_path}:{e}")
             return None
-        except Exception as e:
+        except ValueError as e:  # e.g. null bytes in the source
             print(f"[Phase][AST] Failed to parse {file_path}:{e}")
-            return None
\ No newline at end of file
+            return None
+
+    def extract(self, file_path: str, content: str):
+        """Returns (imports, symbols), or None if the file does not parse."""
+        ast_tree = self.parse(file_path, content)
+        if ast_tree is None:
+            return None
+        extractor = PythonSymbolExtractor(file_path)
+        extractor.visit(ast_tree)
+        return extractor.imports, extractor.symbols
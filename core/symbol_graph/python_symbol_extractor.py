@@ -1,22 +1,71 @@
 import ast
 
+# bump whenever the emitted symbols change, it invalidates the parse cache
+EXTRACTOR_VERSION = 2
+
 class PythonSymbolExtractor(ast.NodeVisitor):
+    """
+    Single pass over a module: symbols with their source spans, file imports,
+    class bases and the call sites of every function/method.
+    Call targets are resolved to symbol ids where the file allows it
+    (self/cls methods, names bound by imports, Class.method); the graph
+    phase keeps only the ones that match a node.
+    """
+
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.imports = []
         self.symbols = []
         self.current_class = None
+        self.current_symbol = None
+        # local name -> imported module / imported symbol name
+        self.module_aliases = set()
+        self.symbol_aliases = {}
     
     def visit_Import(self, node):
         for alias in node.names:
             self.imports.append(alias.name)
+            if alias.asname:
+                self.module_aliases.add(alias.asname)
+            else:
+                self.module_aliases.add(alias.name.split(".")[0])
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name != "*":
+                self.symbol_aliases[alias.asname or alias.name] = alias.name
         if node.module:
             self.imports.append(node.module)
             self.generic_visit(node)
 
+    def _resolve_call(self, func):
+        if isinstance(func, ast.Name):
+            return self.symbol_aliases.get(func.id, func.id)
+
+        attrs = []
+        while isinstance(func, ast.Attribute):
+            attrs.insert(0, func.attr)
+            func = func.value
+        if not attrs or not isinstance(func, ast.Name):
+            return None
+
+        root = func.id
+        if root in ("self", "cls") and self.current_class and len(attrs) == 1:
+            return f"{self.current_class}.{attrs[0]}"
+        if root in self.module_aliases:
+            return ".".join(attrs[-2:])
+        if len(attrs) == 1:
+            return f"{self.symbol_aliases.get(root, root)}.{attrs[0]}"
+        return None
+
+    def visit_Call(self, node):
+        if self.current_symbol is not None:
+            target = self._resolve_call(node.func)
+            if target and target not in self.current_symbol["calls"]:
+                self.current_symbol["calls"].append(target)
+        self.generic_visit(node)
+
     def visit_FunctionDef(self, node):
         parent = self.current_class
     
@@ -27,7 +76,7 @@ class PythonSymbolExtractor(ast.NodeVisitor):
             if parent else node.name
         )
     
-        self.symbols.append({
+        symbol = {
             "symbol_id": symbol_id,
             "type": symbol_type,
             "name": node.name,
@@ -36,14 +85,25 @@ class PythonSymbolExtractor(ast.NodeVisitor):
             "end_line": node.end_lineno,
             "parent": parent,
             "docstring": ast.get_docstring(node),
-        })
+            "bases": [],
+            "calls": [],
+        }
+        self.symbols.append(symbol)
     
+        prev_symbol = self.current_symbol
+        self.current_symbol = symbol
         self.generic_visit(node)
+        self.current_symbol = prev_symbol
+
+    visit_AsyncFunctionDef = visit_FunctionDef
 
     def visit_ClassDef(self, node):
         class_name = node.name
         prev_class = self.current_class
+        prev_symbol = self.current_symbol
         self.current_class = class_name
+        # calls in the class body itself belong to no function
+        self.current_symbol = None
     
         self.symbols.append({
             "symbol_id": class_name,
@@ -54,7 +114,10 @@ class PythonSymbolExtractor(ast.NodeVisitor):
             "end_line": node.end_lineno,
             "parent": None,
             "docstring": ast.get_docstring(node),
+            "bases": [ast.unparse(base) for base in node.bases],
+            "calls": [],
         })
     
         self.generic_visit(node)
         self.current_class = prev_class
+        self.current_symbol = prev_symbol
@@ -1,7 +1,84 @@
 import json
+import os
 from typing import List, Dict
 
-def load_symbols(path: str)-> List[Dict]:
-    with open(path, "r") as f:
-        return json.load(f)
+from reposurfer.core.symbol_graph.symbols import SYMBOL_FIELDS
+from reposurfer.core.symbol_graph.parallel_parser import expand_symbols
+
+SYMBOLS_FILE = "symbols.jsonl"
+SYMBOLS_FORMAT_VERSION = 1
+
+# symbols.jsonl layout, one JSON value per line:
+#   {"format": "reposurfer-symbols", "version": 1, "fields": [...]}   header
+#   {"file_id": 0, "path": "pkg/mod.py", "hash": "...", "imports": [...]}  file record
+#   [0, "Class.method", "method", "method", 10, 20, "Class", null, [], ["helper"]]  symbol row
+# Symbol rows start with the file_id of their file record and follow it directly.
+
+
+class SymbolWriter:
+    """Streams symbols.jsonl one file at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files = 0
+        self.symbols = 0
+        self._tmp_path = f"{path}.tmp"
+        self._f = open(self._tmp_path, "w", encoding="utf-8")
+        self._f.write(json.dumps({
+            "format": "reposurfer-symbols",
+            "version": SYMBOLS_FORMAT_VERSION,
+            "fields": list(SYMBOL_FIELDS),
+        }) + "\n")
+
+    def write_file(self, rel_path: str, imports, rows, content_hash: str = None):
+        file_id = self.files
+        self._f.write(json.dumps({
+            "file_id": file_id, "path": rel_path, "hash": content_hash, "imports": imports,
+        }) + "\n")
+        for row in rows:
+            self._f.write(json.dumps([file_id, *row]) + "\n")
+        self.files += 1
+        self.symbols += len(rows)
+
+    def close(self):
+        self._f.close()
+        os.replace(self._tmp_path, self.path)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            os.remove(self._tmp_path)
+
+
+def iter_symbol_files(path: str):
+    """Yield (file_record, rows) per file, holding a single file in memory."""
+    record, rows = None, []
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != SYMBOLS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported symbols format in {path}, re-run Phase 1")
+        for line in f:
+            value = json.loads(line)
+            if isinstance(value, dict):
+                if record is not None:
+                    yield record, rows
+                record, rows = value, []
+            else:
+                rows.append(value[1:])
+    if record is not None:
+        yield record, rows
+
+
+def iter_symbols(path: str):
+    """Yield symbol dicts; symbols of one file share the same imports list."""
+    for record, rows in iter_symbol_files(path):
+        yield from expand_symbols(record["path"], record["imports"], rows)
+
+
+def load_symbols(path: str)-> List[Dict]:
+    return list(iter_symbols(path))
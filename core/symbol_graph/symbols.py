@@ -1,6 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, List
 
+# column order of a symbol row in symbols.jsonl, the parse cache and worker results
+# ("file" and "imports" live on the file record the row belongs to)
+SYMBOL_FIELDS = ("symbol_id", "type", "name", "start_line", "end_line", "parent", "docstring",
+                 "bases", "calls")
+
 @dataclass
 class Symbol:
     symbol_id: str
@@ -12,4 +17,6 @@ class Symbol:
     parent: Optional[str]
     docstring: Optional[str]
     imports: List[str]
+    bases: List[str] = field(default_factory=list)    # classes only
+    calls: List[str] = field(default_factory=list)    # resolved call targets, functions/methods only
 
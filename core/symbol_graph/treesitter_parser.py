@@ -0,0 +1,376 @@
+import importlib
+
+# bump whenever the emitted symbols change, it invalidates the parse cache
+TREESITTER_EXTRACTOR_VERSION = 2
+
+# grammar -> (module, attribute returning the language pointer)
+GRAMMAR_MODULES = {
+    "javascript": ("tree_sitter_javascript", "language"),
+    "typescript": ("tree_sitter_typescript", "language_typescript"),
+    "tsx": ("tree_sitter_typescript", "language_tsx"),
+    "go": ("tree_sitter_go", "language"),
+    "rust": ("tree_sitter_rust", "language"),
+    "java": ("tree_sitter_java", "language"),
+    "c": ("tree_sitter_c", "language"),
+    "cpp": ("tree_sitter_cpp", "language"),
+}
+
+_JS = {
+    "classes": {"class_declaration", "abstract_class_declaration", "interface_declaration"},
+    "functions": {"function_declaration", "generator_function_declaration", "method_definition"},
+    # `const f = () => ...` and `x = () => ...` class fields, outside function bodies
+    "bound_functions": {"variable_declarator", "field_definition", "public_field_definition"},
+    "heritage": {"class_heritage", "extends_type_clause"},
+    "calls": {"call_expression", "new_expression"},
+    "implicit_this": False,
+}
+
+LANGUAGE_SPECS = {
+    "javascript": _JS,
+    "typescript": _JS,
+    "tsx": _JS,
+    "go": {
+        "classes": {"type_spec"},
+        "functions": {"function_declaration", "method_declaration"},
+        "bound_functions": set(),
+        "heritage": set(),
+        "calls": {"call_expression"},
+        "implicit_this": False,
+    },
+    "rust": {
+        "classes": {"struct_item", "enum_item", "trait_item", "union_item"},
+        "functions": {"function_item"},
+        "bound_functions": set(),
+        "heritage": {"trait_bounds"},
+        "calls": {"call_expression"},
+        "implicit_this": False,
+    },
+    "java": {
+        "classes": {"class_declaration", "interface_declaration", "enum_declaration", "record_declaration"},
+        "functions": {"method_declaration", "constructor_declaration"},
+        "bound_functions": set(),
+        "heritage": {"superclass", "super_interfaces", "extends_interfaces"},
+        "calls": {"method_invocation", "object_creation_expression"},
+        "implicit_this": True,
+    },
+    "c": {
+        "classes": {"struct_specifier", "union_specifier"},
+        "functions": {"function_definition"},
+        "bound_functions": set(),
+        "heritage": set(),
+        "calls": {"call_expression"},
+        "implicit_this": False,
+    },
+    "cpp": {
+        "classes": {"class_specifier", "struct_specifier", "union_specifier"},
+        "functions": {"function_definition"},
+        "bound_functions": set(),
+        "heritage": {"base_class_clause"},
+        "calls": {"call_expression", "new_expression"},
+        "implicit_this": True,
+    },
+}
+
+# nodes whose leading comment belongs to the declaration they wrap
+WRAPPER_NODES = {"export_statement", "template_declaration", "type_declaration",
+                 "lexical_declaration", "variable_declaration"}
+NAME_NODES = {"identifier", "type_identifier", "field_identifier", "property_identifier",
+              "package_identifier", "namespace_identifier", "destructor_name", "operator_name"}
+SCOPED_NODES = {"member_expression", "selector_expression", "field_expression",
+                "scoped_identifier", "qualified_identifier", "scoped_type_identifier",
+                "nested_identifier"}
+SELF_NAMES = {"this", "self", "Self"}
+GENERIC_NODES = {"template_function", "generic_function", "generic_type", "template_type"}
+
+
+def load_language(grammar: str):
+    """tree_sitter.Language for a grammar name; ImportError if it is not installed."""
+    from tree_sitter import Language
+
+    module_name, attr = GRAMMAR_MODULES[grammar]
+    module = importlib.import_module(module_name)
+    return Language(getattr(module, attr)())
+
+
+def _clean_comment(text: str) -> str:
+    lines = []
+    for line in text.strip().splitlines():
+        line = line.strip()
+        for marker in ("/**", "/*!", "/*", "///", "//!", "//", "*/", "*"):
+            if line.startswith(marker):
+                line = line[len(marker):]
+                break
+        if line.endswith("*/"):
+            line = line[:-2]
+        lines.append(line.strip())
+    return "\n".join(lines).strip()
+
+
+class TreeSitterParser:
+    """
+    tree-sitter parser for one grammar, emitting the same imports/symbols as
+    PythonSymbolExtractor.
+    """
+
+    def __init__(self, grammar: str):
+        from tree_sitter import Parser
+
+        self.grammar = grammar
+        self.spec = LANGUAGE_SPECS[grammar]
+        self.parser = Parser(load_language(grammar))
+
+    def extract(self, file_path: str, content: str):
+        """Returns (imports, symbols); tree-sitter recovers from syntax errors, so never None."""
+        tree = self.parser.parse(content.encode("utf-8"))
+        extractor = _TreeSitterExtractor(file_path, self.grammar, self.spec)
+        extractor.visit(tree.root_node)
+        return extractor.imports, extractor.symbols
+
+
+class _TreeSitterExtractor:
+
+    def __init__(self, file_path: str, grammar: str, spec: dict):
+        self.file_path = file_path
+        self.grammar = grammar
+        self.spec = spec
+        self.imports = []
+        self.symbols = []
+        self.current_class = None
+        self.current_symbol = None
+        self.receiver = None  # Go receiver variable, acts like self
+        self.impl_traits = []  # Rust (type, trait) pairs
+
+    @staticmethod
+    def _text(node) -> str:
+        return node.text.decode("utf-8", errors="replace") if node is not None else ""
+
+    # ---- traversal ----
+
+    def visit(self, node):
+        kind = node.type
+        if kind in self.spec["classes"]:
+            if self._visit_class(node):
+                return
+        elif kind in self.spec["functions"]:
+            if self._visit_function(node, node.child_by_field_name("name")):
+                return
+        elif kind in self.spec["bound_functions"]:
+            value = node.child_by_field_name("value")
+            if value is not None and value.type in ("arrow_function", "function_expression", "function") \
+                    and self.current_symbol is None:
+                name = node.child_by_field_name("name") or node.child_by_field_name("property")
+                if self._visit_function(node, name, body=value):
+                    return
+        elif kind == "impl_item":
+            self._visit_impl(node)
+            return
+        elif kind in self.spec["calls"]:
+            self._record_call(node)
+        else:
+            self._record_import(node)
+
+        for child in node.named_children:
+            self.visit(child)
+
+    def _visit_children(self, node):
+        for child in node.named_children:
+            self.visit(child)
+
+    # ---- symbols ----
+
+    def _docstring(self, node):
+        while node.parent is not None and node.parent.type in WRAPPER_NODES:
+            node = node.parent
+        comments = []
+        sibling = node.prev_named_sibling
+        line = node.start_point[0]
+        while sibling is not None and "comment" in sibling.type and sibling.end_point[0] >= line - 1:
+            comments.insert(0, _clean_comment(self._text(sibling)))
+            line = sibling.start_point[0]
+            sibling = sibling.prev_named_sibling
+        return "\n".join(c for c in comments if c) or None
+
+    def _add_symbol(self, node, symbol_type, name, parent, bases=()):
+        symbol = {
+            "symbol_id": f"{parent}.{name}" if parent else name,
+            "type": symbol_type,
+            "name": name,
+            "file": self.file_path,
+            "start_line": node.start_point[0] + 1,
+            "end_line": node.end_point[0] + 1,
+            "parent": parent,
+            "docstring": self._docstring(node),
+            "bases": list(bases),
+            "calls": [],
+        }
+        self.symbols.append(symbol)
+        return symbol
+
+    def _visit_class(self, node):
+        name_node = node.child_by_field_name("name")
+        if name_node is None:
+            return False  # anonymous struct
+        if node.child_by_field_name("body") is None and self.grammar in ("c", "cpp"):
+            return False  # forward declaration; a Rust unit struct (struct A;) has no body either
+        if self.grammar == "go" and node.child_by_field_name("type").type not in ("struct_type", "interface_type"):
+            return False
+
+        bases = []
+        for child in node.children:
+            if child.type in self.spec["heritage"]:
+                bases.extend(self._heritage_names(child))
+
+        name = self._text(name_node)
+        self._add_symbol(node, "class", name, None, bases)
+
+        prev_class, prev_symbol = self.current_class, self.current_symbol
+        self.current_class, self.current_symbol = name, None
+        self._visit_children(node)
+        self.current_class, self.current_symbol = prev_class, prev_symbol
+        return True
+
+    def _heritage_names(self, node):
+        if node.type in NAME_NODES or node.type in SCOPED_NODES:
+            return [self._text(node)]
+        if node.type in ("type_arguments", "access_specifier", "comment"):
+            return []
+        if node.type == "generic_type":
+            return self._heritage_names(node.named_children[0])
+        names = []
+        for child in node.named_children:
+            names.extend(self._heritage_names(child))
+        return names
+
+    def _function_name(self, node, name_node):
+        """(name, parent) with C/C++ declarators unwrapped and Go receivers resolved."""
+        parent = self.current_class
+        if name_node is None:
+            declarator = node.child_by_field_name("declarator")
+            while declarator is not None and declarator.type not in NAME_NODES \
+                    and declarator.type != "qualified_identifier":
+                declarator = declarator.child_by_field_name("declarator")
+            if declarator is None:
+                return None, parent
+            if declarator.type == "qualified_identifier":
+                scope = declarator.child_by_field_name("scope")
+                if scope is not None:
+                    parent = self._text(scope).split("<")[0]
+                name_node = declarator.child_by_field_name("name")
+            else:
+                name_node = declarator
+
+        receiver = node.child_by_field_name("receiver")
+        if receiver is not None:
+            for param in receiver.named_children:
+                type_node = param.child_by_field_name("type")
+                while type_node is not None and type_node.type in ("pointer_type", "generic_type"):
+                    type_node = type_node.named_children[0]
+                parent = self._text(type_node) or parent
+                self.receiver = self._text(param.child_by_field_name("name")) or None
+        return self._text(name_node) or None, parent
+
+    def _visit_function(self, node, name_node, body=None):
+        prev_receiver = self.receiver
+        name, parent = self._function_name(node, name_node)
+        if name is None:
+            return False
+
+        symbol = self._add_symbol(node, "method" if parent else "function", name, parent)
+
+        prev_class, prev_symbol = self.current_class, self.current_symbol
+        self.current_class, self.current_symbol = parent, symbol
+        self._visit_children(body if body is not None else node)
+        self.current_class, self.current_symbol = prev_class, prev_symbol
+        self.receiver = prev_receiver
+        return True
+
+    def _visit_impl(self, node):
+        type_node = node.child_by_field_name("type")
+        while type_node is not None and type_node.type == "generic_type":
+            type_node = type_node.child_by_field_name("type")
+        name = self._text(type_node)
+        trait = node.child_by_field_name("trait")
+        if trait is not None:
+            for symbol in self.symbols:
+                if symbol["symbol_id"] == name and symbol["type"] == "class":
+                    symbol["bases"].extend(self._heritage_names(trait))
+
+        prev_class, prev_symbol = self.current_class, self.current_symbol
+        self.current_class, self.current_symbol = name or None, None
+        self._visit_children(node)
+        self.current_class, self.current_symbol = prev_class, prev_symbol
+
+    # ---- imports ----
+
+    def _record_import(self, node):
+        kind = node.type
+        if kind in ("import_statement", "import_spec", "preproc_include"):
+            target = node.child_by_field_name("source") or node.child_by_field_name("path")
+            text = self._text(target).strip("\"'`<>")
+        elif kind == "import_declaration" and self.grammar == "java":
+            text = " ".join(self._text(c) for c in node.named_children if c.type != "asterisk")
+        elif kind == "use_declaration":
+            text = self._text(node.child_by_field_name("argument"))
+        else:
+            return
+        if text and text not in self.imports:
+            self.imports.append(text)
+
+    # ---- calls ----
+
+    def _resolve_call(self, node):
+        if node.type == "method_invocation":
+            name = self._text(node.child_by_field_name("name"))
+            target = node.child_by_field_name("object")
+            return self._qualify(target, name)
+        # a constructor names a type, never a method of the enclosing class
+        constructor = node.type in ("new_expression", "object_creation_expression")
+        if constructor:
+            func = node.child_by_field_name("constructor") or node.child_by_field_name("type")
+        else:
+            func = node.child_by_field_name("function")
+        if func is None:
+            return None
+
+        while func.type in GENERIC_NODES and func.named_children:
+            func = func.named_children[0]  # f<T>(), new D<T>() -> f, D
+        if func.type in NAME_NODES:
+            return self._qualify(None, self._text(func), explicit=constructor)
+        if func.type in SCOPED_NODES:
+            fields = [func.child_by_field_name(f) for f in ("object", "operand", "value", "argument", "path", "scope")]
+            target = next((f for f in fields if f is not None), None)
+            name_node = func.child_by_field_name("property") or func.child_by_field_name("field") \
+                or func.child_by_field_name("name")
+            if target is None and name_node is None and len(func.named_children) >= 2:
+                # Java's scoped_type_identifier has no fields: a.b.C -> (a.b, C)
+                target, name_node = func.named_children[0], func.named_children[-1]
+            while name_node is not None and name_node.type in GENERIC_NODES and name_node.named_children:
+                name_node = name_node.named_children[0]
+            if name_node is None:
+                return None
+            return self._qualify(target, self._text(name_node), explicit=True)
+        return None
+
+    def _qualify(self, target, name, explicit=False):
+        if not name:
+            return None
+        if target is None:
+            if self.spec["implicit_this"] and self.current_class and not explicit:
+                return f"{self.current_class}.{name}"
+            return name
+        root = self._text(target)
+        if (root in SELF_NAMES or root == self.receiver) and self.current_class:
+            return f"{self.current_class}.{name}"
+        if target.type in NAME_NODES:
+            return f"{root}.{name}"
+        if target.type in SCOPED_NODES:
+            # std::fs::read / pkg.mod.fn -> last qualifier, like module attributes in Python
+            return f"{root.replace('::', '.').split('.')[-1]}.{name}"
+        return None
+
+    def _record_call(self, node):
+        if self.current_symbol is None:
+            return
+        target = self._resolve_call(node)
+        if target and target not in self.current_symbol["calls"]:
+            self.current_symbol["calls"].append(target)